@@ -0,0 +1,3 @@
+# 성능 측정용 패키지 (backend 디렉터리에서 실행)
+#   python -m benchmarks.seed   : 가상 학교 데이터를 students.db 에 생성
+#   python -m benchmarks.run    : 모든 엔드포인트의 지연 시간/처리량/메모리 측정 및 기준값 비교
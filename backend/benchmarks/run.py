@@ -0,0 +1,401 @@
+# 엔드포인트 벤치마크 하네스 (프로세스 안에서 ASGI로 직접 호출하므로 네트워크를 거치지 않음)
+# 사용법:
+#   python -m benchmarks.run --database ./students.db --iterations 200 --concurrency 8
+#   python -m benchmarks.run --save-baseline main      # 결과를 benchmarks/baselines/main.json 에 저장
+#   python -m benchmarks.run --compare main            # 저장된 기준값과 비교, 느려진 항목이 있으면 종료 코드 1
+#   python -m benchmarks.run --trace-memory            # 시나리오별 최대 할당량 (tracemalloc 때문에 지연 시간은 늘어남)
+# 원본 데이터베이스는 임시 디렉터리에 복사한 뒤 측정하므로 쓰기 요청이 원본을 바꾸지 않습니다.
+# LLM 호출은 기본적으로 오프라인 시뮬레이터(CLASSMANAGER_LLM_PROVIDER=simulator)로 처리합니다.
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+
+@dataclass
+class Scenario:
+    name: str
+    # (context, 반복 번호) -> (method, url, httpx 요청 인자)
+    build: Callable[["BenchContext", int], tuple]
+    # 응답을 받은 뒤 다음 시나리오에서 쓸 값을 기록할 때 사용
+    after: Optional[Callable[["BenchContext", Any], None]] = None
+
+
+class BenchContext:
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.student_ids: List[int] = []
+        self.classes: List[tuple] = []
+        self.work_log_dates: List[str] = []
+        self.todo_ids: List[int] = []
+        self.created_student_ids: List[int] = []
+        self.created_todo_ids: List[int] = []
+        self.created_log_dates: List[str] = []
+        self.job_ids: List[str] = []
+        self.import_job_ids: List[str] = []
+        self.sync_seqs: List[int] = []
+        self._future_dates = (
+            (date.today() + timedelta(days=3650 + offset)).isoformat() for offset in itertools.count()
+        )
+
+    def student_id(self) -> int:
+        return self.rng.choice(self.student_ids)
+
+    def next_future_date(self) -> str:
+        return next(self._future_dates)
+
+    async def load(self, main):
+        from sqlalchemy import select
+
+        async with main.ReadSessionLocal() as db:
+            self.student_ids = list(await db.scalars(select(main.Student.id)))
+            self.classes = list((await db.execute(select(main.Student.grade, main.Student.class_num).distinct())).all())
+            self.work_log_dates = [d.isoformat() for d in await db.scalars(select(main.WorkLog.date))]
+            self.todo_ids = list(await db.scalars(select(main.ToDoItem.id)))
+            # 쓰기 시나리오가 끝난 뒤 /sync 델타가 비어 있지 않도록 시작 시점의 변경 번호를 기억합니다.
+            self.sync_seqs = [await db.scalar(select(main.TableVersion.version).where(main.TableVersion.name == "changes"))]
+        if not self.student_ids:
+            raise SystemExit("데이터베이스에 학생이 없습니다. 먼저 python -m benchmarks.seed 를 실행하세요.")
+
+
+def random_consultations(ctx: BenchContext, count: int) -> List[Dict[str, str]]:
+    return [
+        {"date": f"2024-{ctx.rng.randint(1, 12):02d}-{ctx.rng.randint(1, 28):02d}", "content": f"벤치마크 상담 {ctx.rng.random()}"}
+        for _ in range(count)
+    ]
+
+
+def student_body(ctx: BenchContext) -> Dict[str, Any]:
+    return {
+        "grade": 9,
+        "class_num": ctx.rng.randint(1, 5),
+        "student_num": ctx.rng.randint(1, 40),
+        "name": f"벤치{ctx.rng.randint(0, 99999)}",
+        "phone": "010-0000-0000",
+    }
+
+
+def import_csv(ctx: BenchContext, rows: int) -> bytes:
+    lines = ["학년,반,번호,이름,전화번호"]
+    lines += [f"9,{ctx.rng.randint(1, 5)},{n},가져오기{n},010-0000-0000" for n in range(1, rows + 1)]
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+TYPEAHEAD_TERMS = ["ㄱ", "김", "ㄱㅁ", "김ㅁ", "민서", "ㅇㅈ", "박지"]
+SEARCH_TERMS = ["상담", "교우 관계", "지각", "학부모", "수행평가", "진로", "회의", "채점"]
+
+
+def pop_or(items: list, fallback):
+    return items.pop() if items else fallback()
+
+
+# 전체 학생 삭제(DELETE /students/)와 실제 API 키가 필요한 /test/gemini-status 는 측정하지 않습니다.
+SCENARIOS = [
+    Scenario("students.list", lambda ctx, i: ("GET", "/students/", {})),
+    Scenario("students.list.summary", lambda ctx, i: ("GET", "/students/", {"params": {"view": "summary"}})),
+    Scenario("students.list.class", lambda ctx, i: ("GET", "/students/", {"params": dict(zip(("grade", "class_num"), ctx.rng.choice(ctx.classes)))})),
+    Scenario("students.list.page", lambda ctx, i: ("GET", "/students/", {"params": {"limit": 50, "view": "summary"}})),
+    Scenario("students.typeahead", lambda ctx, i: ("GET", "/students/typeahead", {"params": {"q": ctx.rng.choice(TYPEAHEAD_TERMS)}})),
+    Scenario("students.get", lambda ctx, i: ("GET", f"/students/{ctx.student_id()}", {})),
+    Scenario(
+        "students.create",
+        lambda ctx, i: ("POST", "/students/", {"json": student_body(ctx)}),
+        after=lambda ctx, data: ctx.created_student_ids.append(data["id"]),
+    ),
+    Scenario("students.update", lambda ctx, i: ("PUT", f"/students/{ctx.student_id()}", {"json": student_body(ctx)})),
+    Scenario("students.bulk", lambda ctx, i: ("POST", "/students/bulk", {"json": [student_body(ctx) for _ in range(30)]})),
+    Scenario(
+        "students.import",
+        lambda ctx, i: ("POST", "/students/import", {"files": {"file": ("roster.csv", import_csv(ctx, 30), "text/csv")}}),
+        after=lambda ctx, data: ctx.import_job_ids.append(data["id"]),
+    ),
+    Scenario("students.import.status", lambda ctx, i: ("GET", f"/students/import/{ctx.rng.choice(ctx.import_job_ids or ['missing'])}", {})),
+    Scenario(
+        "students.delete",
+        lambda ctx, i: ("DELETE", f"/students/{pop_or(ctx.created_student_ids, ctx.student_id)}", {}),
+    ),
+    Scenario(
+        "consultations.append",
+        lambda ctx, i: ("POST", f"/students/{ctx.student_id()}/consultations", {"json": random_consultations(ctx, 1)[0]}),
+    ),
+    Scenario("consultations.list", lambda ctx, i: ("GET", f"/students/{ctx.student_id()}/consultations", {})),
+    Scenario(
+        "consultations.summarize",
+        lambda ctx, i: ("POST", f"/students/{ctx.student_id()}/summarize-consultations", {"json": {"consultations": random_consultations(ctx, 20)}}),
+    ),
+    Scenario(
+        "consultations.summarize.job",
+        lambda ctx, i: ("POST", f"/students/{ctx.student_id()}/summarize-consultations/jobs", {"json": {"consultations": random_consultations(ctx, 20)}}),
+        after=lambda ctx, data: ctx.job_ids.append(data["id"]),
+    ),
+    Scenario("classes.summaries", lambda ctx, i: ("POST", "/classes/{}/{}/summaries".format(*ctx.rng.choice(ctx.classes)), {})),
+    Scenario("jobs.get", lambda ctx, i: ("GET", f"/jobs/{ctx.rng.choice(ctx.job_ids or ['missing'])}", {})),
+    Scenario("jobs.stats", lambda ctx, i: ("GET", "/jobs/stats", {})),
+    Scenario("cache.summaries.stats", lambda ctx, i: ("GET", "/cache/summaries/stats", {})),
+    Scenario("metrics", lambda ctx, i: ("GET", "/metrics", {})),
+    Scenario("search", lambda ctx, i: ("GET", "/search", {"params": {"q": ctx.rng.choice(SEARCH_TERMS)}})),
+    Scenario("work_logs.list", lambda ctx, i: ("GET", "/work-logs/", {})),
+    Scenario("work_logs.list.page", lambda ctx, i: ("GET", "/work-logs/", {"params": {"limit": 30, "order": "desc", "cursor": ctx.rng.choice(ctx.work_log_dates)}})),
+    Scenario(
+        "work_logs.calendar",
+        lambda ctx, i: ("GET", "/work-logs/calendar/{}/{}".format(*map(int, ctx.rng.choice(ctx.work_log_dates).split("-")[:2])), {}),
+    ),
+    Scenario("work_logs.get", lambda ctx, i: ("GET", f"/work-logs/{ctx.rng.choice(ctx.work_log_dates)}", {})),
+    Scenario(
+        "work_logs.create",
+        lambda ctx, i: ("POST", "/work-logs/", {"json": {"date": ctx.next_future_date(), "content": "벤치마크 업무일지"}}),
+        after=lambda ctx, data: ctx.created_log_dates.append(data["date"]),
+    ),
+    Scenario(
+        "work_logs.update",
+        lambda ctx, i: ("POST", "/work-logs/", {"json": {"date": ctx.rng.choice(ctx.work_log_dates), "content": f"수정된 업무일지 {i}"}}),
+    ),
+    Scenario(
+        "work_logs.batch",
+        lambda ctx, i: ("POST", "/work-logs/batch", {"json": [{"date": ctx.rng.choice(ctx.work_log_dates), "content": f"일괄 업무일지 {i}"} for _ in range(200)]}),
+    ),
+    Scenario(
+        "work_logs.delete",
+        lambda ctx, i: ("DELETE", f"/work-logs/{pop_or(ctx.created_log_dates, ctx.next_future_date)}", {}),
+    ),
+    Scenario("todos.list", lambda ctx, i: ("GET", "/todos/", {})),
+    Scenario(
+        "todos.create",
+        lambda ctx, i: ("POST", "/todos/", {"json": {"content": f"벤치마크 할 일 {i}"}}),
+        after=lambda ctx, data: ctx.created_todo_ids.append(data["id"]),
+    ),
+    Scenario(
+        "todos.update",
+        lambda ctx, i: ("PUT", f"/todos/{ctx.rng.choice(ctx.todo_ids or ctx.created_todo_ids)}", {"json": {"is_completed": ctx.rng.random() < 0.5}}),
+    ),
+    Scenario(
+        "todos.delete",
+        lambda ctx, i: ("DELETE", f"/todos/{pop_or(ctx.created_todo_ids, lambda: 0)}", {}),
+    ),
+    Scenario(
+        "todos.bulk",
+        lambda ctx, i: ("POST", "/todos/bulk", {"json": [{"content": f"일괄 할 일 {i}-{n}"} for n in range(20)]}),
+        after=lambda ctx, data: ctx.created_todo_ids.extend(item["id"] for item in data),
+    ),
+    Scenario(
+        "todos.bulk.update",
+        lambda ctx, i: (
+            "POST",
+            "/todos/bulk/update",
+            {"json": {"ids": ctx.rng.sample(ctx.todo_ids, min(20, len(ctx.todo_ids))), "is_completed": i % 2 == 0}},
+        ),
+    ),
+    Scenario(
+        "todos.bulk.delete",
+        lambda ctx, i: ("POST", "/todos/bulk/delete", {"json": {"ids": [pop_or(ctx.created_todo_ids, lambda: 0) for _ in range(10)]}}),
+    ),
+    Scenario(
+        "todos.from_log",
+        lambda ctx, i: ("POST", "/todos/from-log/", {"json": {"date": date.today().isoformat(), "content": f"업무일지 {i}"}}),
+    ),
+    Scenario(
+        "todos.from_log.job",
+        lambda ctx, i: ("POST", "/todos/from-log/jobs", {"json": {"date": date.today().isoformat(), "content": f"업무일지 {i}"}}),
+    ),
+    Scenario("sync.full", lambda ctx, i: ("GET", "/sync", {})),
+    Scenario("sync.delta", lambda ctx, i: ("GET", "/sync", {"params": {"since": ctx.sync_seqs[0]}})),
+    Scenario("sync.current", lambda ctx, i: ("GET", "/sync", {"params": {"since": ctx.sync_seqs[-1]}}), after=lambda ctx, data: ctx.sync_seqs.append(data["seq"])),
+]
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    # nearest-rank 방식
+    index = max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def peak_rss_mb() -> float:
+    # 프로세스 전체의 최대치라 시나리오별 비교에는 쓸 수 없고 실행이 끝난 뒤 한 번만 보고합니다.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트 단위입니다.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+async def run_scenario(client, ctx: BenchContext, scenario: Scenario, iterations: int, concurrency: int, trace_memory: bool = False) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    counter = itertools.count()
+
+    async def worker():
+        nonlocal errors
+        while (i := next(counter)) < iterations:
+            method, url, kwargs = scenario.build(ctx, i)
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+            elif scenario.after is not None:
+                scenario.after(ctx, response.json())
+
+    if trace_memory:
+        # 시나리오가 시작할 때 할당된 양을 기준으로 이 시나리오 동안 늘어난 최대 할당량을 잽니다.
+        tracemalloc.reset_peak()
+        allocated_before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    result = {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+    }
+    if trace_memory:
+        result["peak_alloc_mb"] = round((tracemalloc.get_traced_memory()[1] - allocated_before) / (1024 * 1024), 2)
+    return result
+
+
+async def run_benchmarks(main, args) -> Dict[str, Dict[str, Any]]:
+    import httpx
+
+    selected = [s for s in SCENARIOS if not args.only or any(s.name.startswith(prefix) for prefix in args.only)]
+    results = {}
+    if args.trace_memory:
+        tracemalloc.start()
+    async with main.lifespan(main.app):
+        ctx = BenchContext(random.Random(args.seed))
+        await ctx.load(main)
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            for scenario in selected:
+                results[scenario.name] = await run_scenario(client, ctx, scenario, args.iterations, args.concurrency, args.trace_memory)
+                print(format_row(scenario.name, results[scenario.name]), flush=True)
+    if args.trace_memory:
+        tracemalloc.stop()
+    return results
+
+
+HEADER = f"{'scenario':<30}{'reqs':>7}{'errs':>6}{'p50':>10}{'p95':>10}{'p99':>10}{'rps':>10}{'alloc MB':>10}"
+
+
+def format_row(name: str, r: Dict[str, Any]) -> str:
+    alloc = f"{r['peak_alloc_mb']:.2f}" if "peak_alloc_mb" in r else "-"
+    return (
+        f"{name:<30}{r['requests']:>7}{r['errors']:>6}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}"
+        f"{r['p99_ms']:>10.2f}{r['throughput_rps']:>10.1f}{alloc:>10}"
+    )
+
+
+def baseline_path(name: str) -> str:
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def save_baseline(name: str, args, results):
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    data = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "iterations": args.iterations,
+        "concurrency": args.concurrency,
+        "process_peak_rss_mb": round(peak_rss_mb(), 1),
+        "results": results,
+    }
+    with open(baseline_path(name), "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    print(f"기준값 저장: {baseline_path(name)}")
+
+
+def compare_baseline(name: str, results, threshold: float, min_delta_ms: float) -> List[str]:
+    with open(baseline_path(name), encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressions = []
+    print(f"\n기준값 '{name}' 대비 p95 변화")
+    for scenario, current in results.items():
+        previous = baseline.get(scenario)
+        if previous is None:
+            print(f"  {scenario:<30} (기준값 없음)")
+            continue
+        ratio = current["p95_ms"] / previous["p95_ms"] if previous["p95_ms"] else math.inf
+        delta = current["p95_ms"] - previous["p95_ms"]
+        # 아주 빠른 요청은 잡음이 크므로 절대 차이도 min_delta_ms 이상일 때만 회귀로 봅니다.
+        regressed = ratio > 1 + threshold and delta > min_delta_ms
+        marker = "  <-- 느려짐" if regressed else ""
+        print(f"  {scenario:<30}{previous['p95_ms']:>10.2f} -> {current['p95_ms']:>10.2f} ms ({ratio:>5.2f}x){marker}")
+        if regressed:
+            regressions.append(scenario)
+    return regressions
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="엔드포인트별 지연 시간, 처리량, 최대 메모리를 측정합니다.")
+    parser.add_argument("--database", default=os.getenv("CLASSMANAGER_DATABASE_PATH", "./students.db"))
+    parser.add_argument("--iterations", type=int, default=200, help="시나리오별 요청 수")
+    parser.add_argument("--concurrency", type=int, default=8, help="동시에 요청을 보내는 작업 수")
+    parser.add_argument("--only", nargs="*", help="이름이 이 접두어로 시작하는 시나리오만 실행 (예: students work_logs)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save-baseline", metavar="NAME")
+    parser.add_argument("--compare", metavar="NAME")
+    parser.add_argument("--threshold", type=float, default=0.2, help="p95가 이 비율 이상 늘면 회귀로 판단 (기본 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0)
+    parser.add_argument("--output", help="결과를 JSON 파일로도 저장")
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="tracemalloc으로 시나리오별 최대 할당량을 측정 (파이썬 코드가 느려지므로 지연 시간 측정과는 따로 실행)",
+    )
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not os.path.exists(args.database):
+        raise SystemExit(f"{args.database} 가 없습니다. 먼저 python -m benchmarks.seed 를 실행하세요.")
+
+    workdir = tempfile.mkdtemp(prefix="classmanager-bench-")
+    database = os.path.join(workdir, "students.db")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(args.database + suffix):
+            shutil.copyfile(args.database + suffix, database + suffix)
+    os.environ["CLASSMANAGER_DATABASE_PATH"] = database
+    os.environ.setdefault("CLASSMANAGER_LLM_PROVIDER", "simulator")
+    os.environ.setdefault("CLASSMANAGER_LLM_SIM_LATENCY", "fixed")
+    os.environ.setdefault("CLASSMANAGER_LLM_SIM_LATENCY_MS", "20")
+    os.environ.setdefault("CLASSMANAGER_LLM_SIM_SEED", str(args.seed))
+    # 설정은 main 모듈을 불러올 때 환경 변수에서 읽으므로 환경 변수를 먼저 지정해야 합니다.
+    import main as app_main
+
+    print(f"{args.database} (복사본: {database}), 시나리오별 {args.iterations}회, 동시성 {args.concurrency}")
+    print(HEADER)
+    try:
+        results = asyncio.run(run_benchmarks(app_main, args))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(f"프로세스 최대 RSS: {peak_rss_mb():.1f} MB")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if args.save_baseline:
+        save_baseline(args.save_baseline, args, results)
+    if args.compare:
+        regressions = compare_baseline(args.compare, results, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"\n느려진 시나리오 {len(regressions)}개: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# 벤치마크용 가상 학교 데이터 생성기
+# 사용법: python -m benchmarks.seed --grades 3 --classes 10 --students 30 --database ./students.db
+import argparse
+import asyncio
+import os
+import random
+import time
+from datetime import date, timedelta
+
+SURNAMES = "김이박최정강조윤장임한오서신권황안송류홍전고문양손배백허유남심노하곽성차주우구민"
+GIVEN_SYLLABLES = "민서준지현우수영도윤하은예진성호연채유태시아주원건희소율다인재혁승빈나경"
+CONSULTATION_TOPICS = [
+    "진로 희망에 대해 이야기함. 관심 분야를 더 탐색해 보기로 함.",
+    "최근 수업 집중도가 떨어져 원인을 물어봄. 수면 부족을 호소함.",
+    "교우 관계 문제로 상담함. 당분간 관찰하며 다시 이야기하기로 함.",
+    "학부모와 통화함. 가정에서의 학습 습관에 대해 공유함.",
+    "중간고사 결과를 함께 분석하고 과목별 학습 계획을 세움.",
+    "동아리 활동에 적극적으로 참여하고 있어 칭찬함.",
+    "지각이 잦아 생활 습관 개선 방안을 함께 정함.",
+    "수행평가 준비 상황을 점검하고 일정 관리를 도와줌.",
+]
+WORK_LOG_ITEMS = [
+    "1교시 수업 진행", "학부모 상담 전화", "교무회의 참석", "수행평가 채점", "생활기록부 입력",
+    "학급 회의 지도", "방과후 보충수업", "출결 정리", "가정통신문 배부", "동아리 지도",
+]
+TODO_ITEMS = [
+    "학부모에게 회신하기", "수행평가 결과 입력하기", "상담 일지 정리하기", "체험학습 신청서 확인하기",
+    "시험 문제 검토하기", "학급 게시판 정리하기", "출결 서류 제출하기", "진로 자료 준비하기",
+]
+
+
+def random_name(rng: random.Random) -> str:
+    return rng.choice(SURNAMES) + "".join(rng.choice(GIVEN_SYLLABLES) for _ in range(2))
+
+
+def random_phone(rng: random.Random) -> str:
+    return f"010-{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}"
+
+
+def school_days(years: int):
+    # 오늘부터 거슬러 올라가며 평일만 돌려줍니다.
+    day = date.today()
+    start = day - timedelta(days=365 * years)
+    while day > start:
+        if day.weekday() < 5:
+            yield day
+        day -= timedelta(days=1)
+
+
+async def seed(main, args) -> dict:
+    from sqlalchemy import func, insert, select
+
+    rng = random.Random(args.seed)
+    async with main.engine.begin() as conn:
+        if args.force:
+            await conn.run_sync(main.Base.metadata.drop_all)
+        await conn.run_sync(main.Base.metadata.create_all)
+
+    async with main.SessionLocal() as db:
+        if await db.scalar(select(func.count()).select_from(main.Student)):
+            raise SystemExit("데이터베이스에 이미 학생이 있습니다. 덮어쓰려면 --force 를 사용하세요.")
+
+        counts = {"students": 0, "consultations": 0, "work_logs": 0, "todos": 0}
+        students, consultations = [], []
+        consultation_days = [day.isoformat() for day in school_days(max(args.years, 1))]
+        student_id = 0
+        for grade in range(1, args.grades + 1):
+            for class_num in range(1, args.classes + 1):
+                for student_num in range(1, args.students + 1):
+                    student_id += 1
+                    students.append({
+                        "id": student_id,
+                        "grade": grade,
+                        "class_num": class_num,
+                        "student_num": student_num,
+                        "name": random_name(rng),
+                        "phone": random_phone(rng),
+                        "address": f"서울시 {rng.choice('동서남북')}구 {rng.randint(1, 300)}번길 {rng.randint(1, 50)}",
+                        "guardian_phone1": random_phone(rng),
+                        "guardian_phone2": random_phone(rng) if rng.random() < 0.5 else None,
+                    })
+                    count = rng.randint(args.min_consultations, args.max_consultations)
+                    for day in sorted(rng.sample(consultation_days, min(count, len(consultation_days)))):
+                        consultations.append({"student_id": student_id, "date": day, "content": rng.choice(CONSULTATION_TOPICS)})
+
+                    if len(consultations) >= args.chunk_size:
+                        await db.execute(insert(main.Student), students)
+                        await db.execute(insert(main.ConsultationRecord), consultations)
+                        await db.commit()
+                        counts["students"] += len(students)
+                        counts["consultations"] += len(consultations)
+                        students, consultations = [], []
+        if students:
+            await db.execute(insert(main.Student), students)
+        if consultations:
+            await db.execute(insert(main.ConsultationRecord), consultations)
+        counts["students"] += len(students)
+        counts["consultations"] += len(consultations)
+
+        work_logs = [
+            {"date": day, "content": "\n".join(rng.sample(WORK_LOG_ITEMS, rng.randint(2, 5)))}
+            for day in school_days(args.years)
+        ]
+        for start in range(0, len(work_logs), args.chunk_size):
+            await db.execute(insert(main.WorkLog), work_logs[start:start + args.chunk_size])
+        counts["work_logs"] = len(work_logs)
+
+        todos = [
+            {"content": rng.choice(TODO_ITEMS), "is_completed": rng.random() < 0.7}
+            for _ in range(args.todos)
+        ]
+        for start in range(0, len(todos), args.chunk_size):
+            await db.execute(insert(main.ToDoItem), todos[start:start + args.chunk_size])
+        counts["todos"] = len(todos)
+        await db.commit()
+    return counts
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="벤치마크용 가상 학교 데이터를 생성합니다.")
+    parser.add_argument("--database", default=None, help="SQLite 파일 경로 (기본값: CLASSMANAGER_DATABASE_PATH 또는 ./students.db)")
+    parser.add_argument("--grades", type=int, default=3)
+    parser.add_argument("--classes", type=int, default=10, help="학년별 학급 수")
+    parser.add_argument("--students", type=int, default=30, help="학급별 학생 수")
+    parser.add_argument("--min-consultations", type=int, default=10)
+    parser.add_argument("--max-consultations", type=int, default=100)
+    parser.add_argument("--years", type=int, default=3, help="업무일지를 만들 기간 (년)")
+    parser.add_argument("--todos", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--force", action="store_true", help="기존 테이블을 지우고 새로 생성")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.database:
+        os.environ["CLASSMANAGER_DATABASE_PATH"] = args.database
+    os.environ.setdefault("CLASSMANAGER_LLM_PROVIDER", "simulator")
+    # 설정은 main 모듈을 불러올 때 환경 변수에서 읽으므로 환경 변수를 먼저 지정해야 합니다.
+    import main as app_main
+
+    async def run():
+        try:
+            return await seed(app_main, args)
+        finally:
+            await app_main.engine.dispose()
+            await app_main.read_engine.dispose()
+
+    started = time.perf_counter()
+    counts = asyncio.run(run())
+    print(
+        f"{app_main.storage_settings.database_path}: 학생 {counts['students']}명, 상담 {counts['consultations']}건, "
+        f"업무일지 {counts['work_logs']}건, 할 일 {counts['todos']}건 ({time.perf_counter() - started:.1f}초)"
+    )
+
+
+if __name__ == "__main__":
+    main()
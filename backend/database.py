@@ -1,20 +0,0 @@
-# backend/database.py
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
-
-SQLALCHEMY_DATABASE_URL = "sqlite:///./students.db"
-
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
-
-# 모든 라우터에서 사용할 수 있도록 get_db 함수를 이곳으로 옮깁니다.
-def get_db():
-    db: Session = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
\ No newline at end of file
@@ -1,33 +1,499 @@
 import json
 import os
+import re
+import bisect
+import math
+import random
 import asyncio
-from fastapi import FastAPI, Depends, HTTPException, status
-from sqlalchemy import create_engine, Column, Integer, String, Date, Boolean
+import hashlib
+import time
+import csv
+import codecs
+import shutil
+import tempfile
+import uuid
+import anyio
+from abc import ABC, abstractmethod
+import logging
+import logging.handlers
+import queue
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, HTTPException, status, UploadFile, File, BackgroundTasks, Query, Path, Body, Response, Header
+from sqlalchemy import event, inspect, select, insert, update, delete, func, text, literal, tuple_, Column, Integer, String, Date, Boolean, Float, ForeignKey, Index
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.orm import Session, relationship, selectinload
+from starlette.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Optional
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import List, Optional, Dict, Any, ClassVar, Literal, Union
 from datetime import date
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, ValidationError, Json
 from google import genai
 from google.genai import types # 변경된 import 구문
 
+logger = logging.getLogger("classmanager")
+
+# ====================================================================
+# 설정 (환경 변수 <env_prefix><필드명>으로 변경 가능)
+# ====================================================================
+class EnvSettings(BaseModel):
+    env_prefix: ClassVar[str] = "CLASSMANAGER_"
+
+    @classmethod
+    def from_env(cls):
+        values = {}
+        for name in cls.model_fields:
+            env_value = os.getenv(f"{cls.env_prefix}{name.upper()}")
+            if env_value is not None:
+                values[name] = env_value
+        return cls(**values)
+
+class StorageSettings(EnvSettings):
+    database_path: str = "./students.db"
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    busy_timeout_ms: int = 5000
+    cache_size_kb: int = 16384
+    read_pool_size: int = 4
+    write_pool_timeout: float = 30.0
+
+class LLMSettings(EnvSettings):
+    env_prefix: ClassVar[str] = "CLASSMANAGER_LLM_"
+    provider: Literal["gemini", "simulator"] = "gemini"
+    model: str = "gemini-1.5-flash-latest"
+    max_concurrency: int = 4
+    timeout_seconds: float = 30.0
+    # 학급 단위 요약 시 한 번의 호출에 묶을 수 있는 상담 기록 글자 수와 학생 수
+    batch_prompt_chars: int = 12000
+    batch_max_students: int = 8
+
+class LLMSimulatorSettings(EnvSettings):
+    env_prefix: ClassVar[str] = "CLASSMANAGER_LLM_SIM_"
+    latency: Literal["fixed", "lognormal", "heavy_tail"] = "lognormal"
+    latency_ms: float = 800.0  # fixed는 그 값, lognormal은 중앙값, heavy_tail은 최솟값
+    latency_sigma: float = 0.5  # lognormal의 퍼짐 정도
+    tail_alpha: float = 1.5  # heavy_tail(파레토) 꼬리 지수, 작을수록 아주 느린 호출이 잦아집니다
+    max_latency_ms: float = 120000.0
+    error_rate: float = 0.0
+    response_chars: int = 200
+    seed: Optional[int] = None
+
+class SummaryCacheSettings(EnvSettings):
+    env_prefix: ClassVar[str] = "CLASSMANAGER_SUMMARY_CACHE_"
+    memory_entries: int = 512
+    max_rows: int = 5000
+    ttl_seconds: float = 7 * 24 * 3600
+
+storage_settings = StorageSettings.from_env()
+llm_settings = LLMSettings.from_env()
+summary_cache_settings = SummaryCacheSettings.from_env()
+
+class JobSettings(EnvSettings):
+    env_prefix: ClassVar[str] = "CLASSMANAGER_JOBS_"
+    workers: int = 2
+    max_attempts: int = 3
+    retry_backoff_seconds: float = 2.0
+    poll_interval_seconds: float = 1.0
+    retention_seconds: float = 7 * 24 * 3600  # 끝난 작업(요청 본문 포함)을 보관하는 기간
+
+job_settings = JobSettings.from_env()
+
+class EventSettings(EnvSettings):
+    env_prefix: ClassVar[str] = "CLASSMANAGER_EVENTS_"
+    queue_size: int = 256  # 구독자별로 쌓아 둘 수 있는 이벤트 수 (넘치면 연결을 끊음)
+    heartbeat_seconds: float = 15.0  # 프록시가 유휴 연결을 끊지 않도록 보내는 주석 간격
+    max_subscribers: int = 1000
+
+event_settings = EventSettings.from_env()
+
+class ProfilerSettings(EnvSettings):
+    # 개발/디버깅용 SQL 프로파일러 (기본 꺼짐). 켜면 요청마다 실행된 SQL 문을 모두 기록합니다.
+    env_prefix: ClassVar[str] = "CLASSMANAGER_PROFILER_"
+    enabled: bool = False
+    slow_query_ms: float = 100.0  # 이 시간 이상 걸린 SQL 문은 느린 쿼리 로그에 남김
+    repeat_threshold: int = 5  # 한 요청에서 같은 SQL 문이 이 횟수 이상 실행되면 N+1 의심으로 표시
+    log_path: str = "slow_queries.log"
+    log_max_bytes: int = 5 * 1024 * 1024
+    log_backup_count: int = 3
+    response_headers: bool = True  # X-Query-Count / Server-Timing 응답 헤더
+    recent_requests: int = 50  # /debug/queries 에서 보여 줄 최근 요청 수
+    max_statements: int = 1000  # 요청 하나에 대해 보관할 SQL 문 수 상한
+
+profiler_settings = ProfilerSettings.from_env()
+
 # ====================================================================
 # 데이터베이스 설정
 # ====================================================================
-SQLALCHEMY_DATABASE_URL = "sqlite:///./students.db"
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+SQLALCHEMY_DATABASE_URL = f"sqlite+aiosqlite:///{storage_settings.database_path}"
+
+# 쓰기는 연결 하나로 직렬화하고, 읽기(GET)는 WAL 덕분에 쓰기와 동시에 진행되는 별도 풀을 사용합니다.
+# 두 엔진 모두 aiosqlite 기반이라 DB 대기 중에도 스레드풀 워커를 점유하지 않습니다.
+engine = create_async_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    pool_size=1,
+    max_overflow=0,
+    pool_timeout=storage_settings.write_pool_timeout,
+)
+read_engine = create_async_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    pool_size=storage_settings.read_pool_size,
+    max_overflow=0,
 )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def _apply_sqlite_pragmas(dbapi_connection, read_only: bool):
+    cursor = dbapi_connection.cursor()
+    if not read_only:
+        cursor.execute(f"PRAGMA journal_mode={storage_settings.journal_mode}")
+    cursor.execute(f"PRAGMA synchronous={storage_settings.synchronous}")
+    cursor.execute(f"PRAGMA busy_timeout={int(storage_settings.busy_timeout_ms)}")
+    cursor.execute(f"PRAGMA cache_size={-int(storage_settings.cache_size_kb)}")
+    if read_only:
+        cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+@event.listens_for(engine.sync_engine, "connect")
+def _on_write_connect(dbapi_connection, connection_record):
+    _apply_sqlite_pragmas(dbapi_connection, read_only=False)
+
+@event.listens_for(read_engine.sync_engine, "connect")
+def _on_read_connect(dbapi_connection, connection_record):
+    _apply_sqlite_pragmas(dbapi_connection, read_only=True)
+
+# 커밋 후에도 객체를 다시 읽지 않도록 expire_on_commit=False로 둡니다 (비동기 세션은 지연 로딩 불가).
+SessionLocal = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+ReadSessionLocal = async_sessionmaker(bind=read_engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
-def get_db():
-    db: Session = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+# GET 핸들러 전용 읽기 세션
+async def get_read_db():
+    async with ReadSessionLocal() as db:
+        yield db
+
+class DatabaseProcessLock:
+    # 테이블 버전(ETag), 학생 이름 색인, 변경 알림(SSE)은 프로세스 메모리에 있으므로
+    # 한 데이터베이스에는 서버 프로세스 하나만 붙어야 합니다 (uvicorn --workers 1).
+    # 두 번째 프로세스는 오래된 ETag로 304를 돌려주는 대신 시작 단계에서 실패하도록 파일 잠금으로 막습니다.
+    def __init__(self, database_path: str):
+        self.path = f"{database_path}.lock"
+        self._file = None
+
+    def acquire(self):
+        lock_file = open(self.path, "a+")
+        try:
+            if os.name == "nt":
+                import msvcrt
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            raise RuntimeError(
+                f"{storage_settings.database_path} 을(를) 다른 서버 프로세스가 이미 사용 중입니다. "
+                "워커는 하나만 실행하세요 (uvicorn --workers 1)."
+            )
+        self._file = lock_file
+
+    def release(self):
+        if self._file is None:
+            return
+        if os.name == "nt":
+            import msvcrt
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        self._file.close()  # POSIX flock은 파일을 닫으면 풀립니다.
+        self._file = None
+
+database_lock = DatabaseProcessLock(storage_settings.database_path)
+
+# ====================================================================
+# 메트릭 (Prometheus 텍스트 형식, GET /metrics)
+# ====================================================================
+# 모든 값은 이벤트 루프 스레드에서만 갱신하므로 잠금 없이 dict/list 값을 더하는 것으로 기록합니다.
+# (SQLAlchemy 이벤트도 aiosqlite 비동기 엔진에서는 같은 스레드의 greenlet 안에서 호출됩니다.)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LLM_LATENCY_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+SIZE_BUCKETS = (100, 500, 1000, 2000, 5000, 10000, 20000, 50000, 100000)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values: Dict[tuple, Any] = {}
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        for label_values, value in self.samples():
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}")
+        return lines
+
+    def samples(self):
+        return list(self._values.items())
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *label_values, amount: float = 1):
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labels: tuple = (), collect=None):
+        # collect를 주면 수집(스크레이프) 시점에 {라벨 값 튜플: 값}을 계산합니다.
+        super().__init__(name, help_text, labels)
+        self._collect = collect
+
+    def add(self, amount: float, *label_values):
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        return list(self._collect().items()) if self._collect else list(self._values.items())
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = buckets
+
+    def observe(self, value: float, *label_values):
+        series = self._values.get(label_values)
+        if series is None:
+            # [버킷별 개수(누적 아님, 마지막은 +Inf), 합계]
+            series = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        for label_values, (counts, total) in list(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                bucket_label = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, label_values, bucket_label)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, label_values)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, label_values)} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str, labels: tuple = ()) -> Counter:
+        return self.register(Counter(name, help_text, labels))
+
+    def gauge(self, name: str, help_text: str, labels: tuple = (), collect=None) -> Gauge:
+        return self.register(Gauge(name, help_text, labels, collect))
+
+    def histogram(self, name: str, help_text: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help_text, labels, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+
+class RequestStats:
+    # 요청 하나 동안 실행된 SQL 문 수와 시간 (MetricsMiddleware가 만들고 DB 이벤트가 채움)
+    __slots__ = ("queries", "query_seconds", "statements", "finished")
+
+    def __init__(self, profile: bool = False):
+        self.queries = 0
+        self.query_seconds = 0.0
+        # 응답을 다 보낸 뒤 같은 컨텍스트에서 도는 BackgroundTasks의 쿼리는 요청에 포함하지 않습니다.
+        self.finished = False
+        # 프로파일러가 켜져 있을 때만 (엔진, SQL 문, 소요 시간)을 모읍니다.
+        self.statements: Optional[List[tuple]] = [] if profile else None
+
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+http_requests_total = metrics.counter("http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status"))
+http_request_seconds = metrics.histogram("http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route"))
+http_requests_in_flight = metrics.gauge("http_requests_in_flight", "HTTP requests currently being handled.", ("method",))
+http_exceptions_total = metrics.counter("http_exceptions_total", "Unhandled exceptions raised by route handlers.", ("method", "route"))
+http_request_db_queries = metrics.histogram("http_request_db_queries", "SQL statements executed per HTTP request.", ("method", "route"), COUNT_BUCKETS)
+http_request_db_seconds = metrics.histogram("http_request_db_seconds", "Time spent in SQL statements per HTTP request.", ("method", "route"))
+db_query_seconds = metrics.histogram("db_query_duration_seconds", "SQL statement latency by engine.", ("engine",))
+db_errors_total = metrics.counter("db_errors_total", "SQL statements that raised an error.", ("engine",))
+db_slow_queries_total = metrics.counter("db_slow_queries_total", "SQL statements slower than the profiler threshold.", ("engine",))
+db_repeated_statements_total = metrics.counter("db_repeated_statements_total", "Requests that repeated one SQL statement past the N+1 threshold.", ("method", "route"))
+llm_requests_total = metrics.counter("llm_requests_total", "LLM calls by provider and outcome (ok, error, timeout).", ("provider", "outcome"))
+llm_request_seconds = metrics.histogram("llm_request_duration_seconds", "LLM call latency including gateway queueing.", ("provider",), LLM_LATENCY_BUCKETS)
+llm_prompt_chars = metrics.histogram("llm_prompt_chars", "LLM prompt size in characters.", ("provider",), SIZE_BUCKETS)
+llm_response_chars = metrics.histogram("llm_response_chars", "LLM response size in characters.", ("provider",), SIZE_BUCKETS)
+
+def _threadpool_stats() -> Dict[tuple, float]:
+    # run_in_threadpool / 동기 핸들러가 쓰는 anyio 기본 스레드 제한기
+    statistics = anyio.to_thread.current_default_thread_limiter().statistics()
+    return {("in_use",): statistics.borrowed_tokens, ("max",): statistics.total_tokens, ("waiting",): statistics.tasks_waiting}
+
+metrics.gauge("threadpool_threads", "Worker threadpool usage (in_use, max, waiting tasks).", ("state",), collect=_threadpool_stats)
+metrics.gauge(
+    "db_pool_connections_in_use",
+    "Checked-out connections per SQLAlchemy pool.",
+    ("engine",),
+    collect=lambda: {("write",): engine.pool.checkedout(), ("read",): read_engine.pool.checkedout()},
+)
+
+def _truncate(value: str, limit: int) -> str:
+    return value if len(value) <= limit else value[:limit] + "..."
+
+class QueryProfiler:
+    # 느린 쿼리와 N+1 의심 요청을 회전 로그 파일에 남깁니다.
+    # 파일 쓰기는 QueueListener 스레드가 맡으므로 DB 이벤트 훅과 이벤트 루프는 큐에 넣기만 합니다.
+    def __init__(self, settings: ProfilerSettings):
+        self.settings = settings
+        self.enabled = settings.enabled
+        self.recent: deque = deque(maxlen=max(settings.recent_requests, 1))
+        self._logger = logging.getLogger("classmanager.queries")
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        self._logger.addHandler(logging.NullHandler())  # start() 전에는 stderr(lastResort)로 새지 않도록
+        self._handler: Optional[logging.Handler] = None
+        self._listener: Optional[logging.handlers.QueueListener] = None
+
+    def start(self):
+        if not self.enabled or self._listener is not None:
+            return
+        file_handler = logging.handlers.RotatingFileHandler(
+            self.settings.log_path,
+            maxBytes=self.settings.log_max_bytes,
+            backupCount=self.settings.log_backup_count,
+            encoding="utf-8",
+        )
+        file_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._handler = logging.handlers.QueueHandler(log_queue)
+        self._logger.addHandler(self._handler)
+        self._listener = logging.handlers.QueueListener(log_queue, file_handler)
+        self._listener.start()
+
+    def stop(self):
+        if self._listener is None:
+            return
+        self._listener.stop()
+        self._logger.removeHandler(self._handler)
+        for handler in self._listener.handlers:
+            handler.close()
+        self._listener = None
+        self._handler = None
+
+    def record(self, stats: Optional[RequestStats], engine_name: str, statement: str, parameters, elapsed: float):
+        # after_cursor_execute 에서 호출됩니다. 요청 밖(작업 큐, 시작 시 마이그레이션)의 느린 쿼리도 기록합니다.
+        if stats is not None and stats.statements is not None and len(stats.statements) < self.settings.max_statements:
+            stats.statements.append((engine_name, statement, elapsed))
+        if elapsed * 1000 >= self.settings.slow_query_ms:
+            db_slow_queries_total.inc(engine_name)
+            self._logger.warning(
+                "slow query %.1fms engine=%s sql=%s params=%s",
+                elapsed * 1000,
+                engine_name,
+                " ".join(statement.split()),
+                _truncate(repr(parameters), 500),
+            )
+
+    def finish(self, stats: RequestStats, method: str, path: str, route: str, status_code: int, elapsed: float):
+        # 요청이 끝나면 같은 SQL 문(바인드 파라미터 자리표시자 기준)을 묶어 반복 실행을 찾습니다.
+        grouped: Dict[str, List[float]] = {}
+        for _, statement, seconds in stats.statements:
+            grouped.setdefault(statement, []).append(seconds)
+        repeated = [
+            {"sql": " ".join(statement.split()), "count": len(timings), "total_ms": round(sum(timings) * 1000, 3)}
+            for statement, timings in grouped.items()
+            if len(timings) >= self.settings.repeat_threshold
+        ]
+        repeated.sort(key=lambda item: item["count"], reverse=True)
+        if repeated:
+            db_repeated_statements_total.inc(method, route)
+            for item in repeated:
+                self._logger.warning(
+                    "possible N+1 %s %s: %d executions (%.1fms) sql=%s",
+                    method, path, item["count"], item["total_ms"], item["sql"],
+                )
+        self.recent.append({
+            "method": method,
+            "path": path,
+            "route": route,
+            "status": status_code,
+            "duration_ms": round(elapsed * 1000, 3),
+            "queries": stats.queries,
+            "query_ms": round(stats.query_seconds * 1000, 3),
+            "repeated": repeated,
+            "statements": [
+                {"engine": engine_name, "sql": " ".join(statement.split()), "ms": round(seconds * 1000, 3)}
+                for engine_name, statement, seconds in stats.statements
+            ],
+        })
+
+    def response_headers(self, stats: RequestStats) -> List[tuple]:
+        # 응답 시작 시점까지 실행된 SQL 문 기준 (스트리밍 응답은 본문을 보내는 동안의 쿼리가 빠짐)
+        return [
+            (b"x-query-count", str(stats.queries).encode()),
+            (b"server-timing", f'db;dur={stats.query_seconds * 1000:.1f};desc="{stats.queries} queries"'.encode()),
+        ]
+
+query_profiler = QueryProfiler(profiler_settings)
+
+def _instrument_engine(async_engine, engine_name: str):
+    @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_started"] = time.perf_counter()
+
+    @event.listens_for(async_engine.sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info.pop("query_started", time.perf_counter())
+        db_query_seconds.observe(elapsed, engine_name)
+        stats = current_request_stats.get()
+        if stats is not None and stats.finished:
+            stats = None
+        if stats is not None:
+            stats.queries += 1
+            stats.query_seconds += elapsed
+        if query_profiler.enabled:
+            query_profiler.record(stats, engine_name, statement, parameters, elapsed)
+
+    @event.listens_for(async_engine.sync_engine, "handle_error")
+    def _handle_error(exception_context):
+        db_errors_total.inc(engine_name)
+
+_instrument_engine(engine, "write")
+_instrument_engine(read_engine, "read")
 
 # ====================================================================
 # 모델 (ORM)
@@ -43,19 +509,94 @@ class Student(Base):
     address = Column(String, nullable=True)
     guardian_phone1 = Column(String, nullable=True)
     guardian_phone2 = Column(String, nullable=True)
-    consultations = Column(String, nullable=True)
+    # 예전 버전에서 상담 기록을 JSON 문자열로 저장하던 컬럼 (마이그레이션 후 NULL)
+    legacy_consultations = Column("consultations", String, nullable=True)
+    consultations = relationship(
+        "ConsultationRecord",
+        order_by="(ConsultationRecord.date, ConsultationRecord.id)",
+        cascade="all, delete-orphan",
+    )
+    change_seq = Column(Integer, nullable=True, index=True)  # 마지막으로 바뀐 변경 번호 (/sync), 상담 기록이 바뀌어도 올라감
+    # 학급 단위 조회와 (학년, 반, 번호) 순 키셋 페이지네이션을 위한 복합 인덱스
+    __table_args__ = (Index("ix_students_roster", "grade", "class_num", "student_num"),)
+
+class ConsultationRecord(Base):
+    __tablename__ = "consultations"
+    id = Column(Integer, primary_key=True)
+    student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
+    date = Column(String, nullable=False)
+    content = Column(String, nullable=False)
+    __table_args__ = (Index("ix_consultations_student_id_date", "student_id", "date"),)
 
 class WorkLog(Base):
     __tablename__ = "work_logs"
     id = Column(Integer, primary_key=True, index=True)
     date = Column(Date, unique=True)
     content = Column(String)
+    change_seq = Column(Integer, nullable=True, index=True)
 
 class ToDoItem(Base):
     __tablename__ = "todos"
     id = Column(Integer, primary_key=True, index=True)
     content = Column(String, index=True)
     is_completed = Column(Boolean, default=False)
+    change_seq = Column(Integer, nullable=True, index=True)
+    source_date = Column(Date, nullable=True, index=True)  # 업무일지에서 추출한 경우 그 일지의 날짜
+
+class Tombstone(Base):
+    # 삭제된 행을 /sync 로 알려주기 위한 기록 (같은 id로 다시 생성되면 지워짐)
+    __tablename__ = "tombstones"
+    table_name = Column(String, primary_key=True)
+    row_id = Column(Integer, primary_key=True)
+    seq = Column(Integer, nullable=False, index=True)
+
+class WorkLogSegment(Base):
+    # 할 일 추출에 이미 보낸 업무일지 문단 (같은 문단을 다시 LLM에 보내지 않기 위함)
+    __tablename__ = "work_log_segments"
+    log_date = Column(Date, primary_key=True)
+    content_hash = Column(String, primary_key=True)  # 공백을 정규화한 문단의 SHA-256
+
+class SummaryCacheEntry(Base):
+    __tablename__ = "summary_cache"
+    key = Column(String, primary_key=True)  # 정규화한 상담 기록 + 프롬프트 버전 + 모델명의 SHA-256
+    model = Column(String, nullable=False)
+    summary = Column(String, nullable=False)
+    created_at = Column(Float, nullable=False, index=True)
+    expires_at = Column(Float, nullable=False)
+
+class TableVersion(Base):
+    __tablename__ = "table_versions"
+    name = Column(String, primary_key=True)  # students, work_logs, todos, changes, sync_floor
+    version = Column(Integer, nullable=False)
+
+class LLMJob(Base):
+    __tablename__ = "llm_jobs"
+    id = Column(String, primary_key=True)
+    kind = Column(String, nullable=False)  # summarize_consultations, extract_todos
+    payload = Column(String, nullable=False)  # 요청 본문 JSON
+    status = Column(String, nullable=False)  # queued, running, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    result = Column(String, nullable=True)  # 결과 JSON
+    error = Column(String, nullable=True)
+    created_at = Column(Float, nullable=False)
+    available_at = Column(Float, nullable=False)  # 재시도 대기 중이면 이 시각 이후에 다시 실행
+    started_at = Column(Float, nullable=True, index=True)  # /jobs/stats 최근 대기 시간
+    finished_at = Column(Float, nullable=True, index=True)  # 보관 기간이 지난 작업 정리에 사용
+    __table_args__ = (Index("ix_llm_jobs_status_available_at", "status", "available_at"),)
+
+class StudentImport(Base):
+    # 명단 가져오기 진행 상황 (재시작 후에도 조회할 수 있도록 DB에 보관)
+    __tablename__ = "student_imports"
+    id = Column(String, primary_key=True)
+    filename = Column(String, nullable=False)
+    status = Column(String, nullable=False)  # pending, running, done, failed
+    processed = Column(Integer, nullable=False, default=0)
+    created = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    errors = Column(String, nullable=True)  # StudentImportError 목록 JSON
+    detail = Column(String, nullable=True)
+    created_at = Column(Float, nullable=False)
+    finished_at = Column(Float, nullable=True, index=True)  # 보관 기간이 지난 기록 정리에 사용
 
 # ====================================================================
 # 스키마 (Pydantic)
@@ -65,6 +606,10 @@ class Consultation(BaseModel):
     content: str
     model_config = {"from_attributes": True}
 
+class ConsultationSchema(Consultation):
+    id: int
+    student_id: int
+
 class StudentBase(BaseModel):
     grade: int
     class_num: int
@@ -86,6 +631,38 @@ class StudentSchema(StudentBase):
     consultations: Optional[List[Consultation]] = None
     model_config = {"from_attributes": True}
 
+class StudentSummary(BaseModel):
+    # 목록 화면용 경량 스키마 (상담 기록, 연락처 제외)
+    id: int
+    grade: int
+    class_num: int
+    student_num: int
+    name: str
+    model_config = {"from_attributes": True}
+
+class BulkRowError(BaseModel):
+    # 일괄 요청(학생, 업무일지)에서 검증에 실패한 행: 요청 목록에서의 위치(0부터)와 pydantic 오류 목록
+    index: int
+    errors: List[Dict[str, Any]]
+
+class StudentBulkResult(BaseModel):
+    created: List[StudentSchema]
+    errors: List[BulkRowError]
+
+class StudentImportError(BulkRowError):
+    # index는 빈 행을 뺀 데이터 행 순번, row는 파일에서의 실제 행 번호 (머리글 = 1)
+    row: Optional[int] = None
+
+class StudentImportStatus(BaseModel):
+    id: str
+    filename: str
+    status: str  # pending, running, done, failed
+    processed: int = 0
+    created: int = 0
+    error_count: int = 0
+    errors: List[StudentImportError] = []
+    detail: Optional[str] = None
+
 class WorkLogBase(BaseModel):
     date: date
     content: str
@@ -100,6 +677,18 @@ class WorkLogSchema(WorkLogBase):
     id: int
     model_config = {"from_attributes": True}
 
+class WorkLogBatchResult(BaseModel):
+    created: int
+    updated: int
+    errors: List[BulkRowError]
+
+class WorkLogCalendarDay(BaseModel):
+    # 달력 화면용: 본문 전체 대신 앞부분 미리보기만 담습니다.
+    date: date
+    preview: str
+
+    model_config = {"from_attributes": True}
+
 class ToDoItemBase(BaseModel):
     content: str
     is_completed: bool = False
@@ -113,132 +702,1732 @@ class ToDoItemUpdate(ToDoItemBase):
 
 class ToDoItemSchema(ToDoItemBase):
     id: int
+    source_date: Optional[date] = None
     model_config = {"from_attributes": True}
 
+class ToDoBulkSelection(BaseModel):
+    # ids 또는 status 중 하나로 대상을 고릅니다 (status="completed"이면 완료된 할 일 전체)
+    ids: Optional[List[int]] = Field(None, max_length=10000)
+    status: Optional[Literal["all", "completed", "active"]] = None
+
+class ToDoBulkUpdate(ToDoBulkSelection):
+    is_completed: bool
+
+class ToDoBulkResult(BaseModel):
+    ids: List[int]  # 실제로 바뀌거나 삭제된 할 일
+
 class ConsultationList(BaseModel):
     consultations: List[Consultation]
     model_config = {"from_attributes": True}
 
+class SearchHit(BaseModel):
+    kind: Literal["consultation", "work_log"]
+    id: int
+    date: str
+    snippet: str
+    highlights: List[List[int]]  # snippet 안에서 검색어가 나타나는 [시작, 끝) 위치
+    score: float  # bm25 점수, 작을수록 관련도가 높음
+    student_id: Optional[int] = None
+    student_name: Optional[str] = None
+
+class JobSchema(BaseModel):
+    id: str
+    kind: str
+    status: str
+    attempts: int
+    result: Optional[Json[Any]] = None
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    model_config = {"from_attributes": True}
+
+class JobQueueStats(BaseModel):
+    queued: int
+    running: int
+    done: int
+    failed: int
+    oldest_queued_age_seconds: Optional[float] = None
+    avg_wait_seconds: Optional[float] = None  # 최근 작업들의 대기열 대기 시간 평균
+
+class SummaryCacheStats(BaseModel):
+    memory_hits: int
+    persistent_hits: int
+    misses: int
+    memory_entries: int
+
+# ====================================================================
+# 테이블 버전 (ETag / 조건부 GET)
+# ====================================================================
+class TableVersions:
+    # 쓰기 트랜잭션 안에서 버전을 올리고, 커밋이 끝난 뒤에야 메모리의 버전을 바꿉니다.
+    # 다른 프로세스의 커밋은 보이지 않으므로 단일 프로세스를 전제로 합니다 (DatabaseProcessLock).
+    # 커밋 전에 바꾸면 아직 이전 데이터를 보는 읽기 요청이 새 ETag를 붙여 내보낼 수 있습니다.
+    # "changes"는 세 테이블 전체에 걸친 변경 번호(/sync 커서)입니다.
+    NAMES = ("students", "work_logs", "todos", "changes")
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._info_key = ("table_versions", id(self))
+        event.listen(Session, "after_commit", self._publish)
+        event.listen(Session, "after_rollback", self._discard)
+
+    async def load(self, db: AsyncSession):
+        existing = set(await db.scalars(select(TableVersion.name)))
+        # 처음 값을 현재 시각(ms)으로 두면 데이터베이스 파일을 새로 만들어도 예전 ETag와 겹치지 않습니다.
+        initial = int(time.time() * 1000)
+        for name in self.NAMES:
+            if name not in existing:
+                db.add(TableVersion(name=name, version=initial))
+        await db.commit()
+        self._versions = dict((await db.execute(select(TableVersion.name, TableVersion.version))).all())
+
+    async def bump(self, db: AsyncSession, name: str):
+        version = await db.scalar(
+            update(TableVersion)
+            .where(TableVersion.name == name)
+            .values(version=TableVersion.version + 1)
+            .returning(TableVersion.version)
+            .execution_options(synchronize_session=False)
+        )
+        db.info.setdefault(self._info_key, {})[name] = version
+
+    def _publish(self, session):
+        for name, version in session.info.pop(self._info_key, {}).items():
+            if version is not None and version > self._versions.get(name, 0):
+                self._versions[name] = version
+
+    def _discard(self, session):
+        session.info.pop(self._info_key, None)
+
+    def version(self, name: str) -> int:
+        return self._versions.get(name, 0)
+
+    def etag(self, name: str) -> str:
+        return f'"{name}-{self.version(name)}"'
+
+table_versions = TableVersions()
+
+# ====================================================================
+# 변경 번호와 삭제 기록 (/sync 델타 동기화)
+# ====================================================================
+class ChangeTracker:
+    # ORM으로 추가/수정된 학생, 업무일지, 할 일 행에는 flush 직전에 새 변경 번호를 찍고,
+    # 삭제된 행은 같은 번호로 tombstones 테이블에 남깁니다.
+    # ORM을 거치지 않는 일괄 INSERT/DELETE 경로는 next_seq / clear_tombstones 를 직접 호출합니다.
+    TABLES = {"students": Student, "work_logs": WorkLog, "todos": ToDoItem}
+
+    def __init__(self):
+        self._new_key = ("change_tracker_new", id(self))
+        event.listen(Session, "before_flush", self._before_flush)
+        event.listen(Session, "after_flush", self._after_flush)
+
+    def _tracked(self, obj) -> bool:
+        return isinstance(obj, tuple(self.TABLES.values()))
+
+    def _next_seq(self, session) -> int:
+        seq = session.execute(
+            update(TableVersion)
+            .where(TableVersion.name == "changes")
+            .values(version=TableVersion.version + 1)
+            .returning(TableVersion.version)
+            .execution_options(synchronize_session=False)
+        ).scalar_one()
+        session.info.setdefault(table_versions._info_key, {})["changes"] = seq
+        return seq
+
+    async def next_seq(self, db: AsyncSession) -> int:
+        return await db.run_sync(self._next_seq)
+
+    def _before_flush(self, session, flush_context, instances):
+        new = [obj for obj in session.new if self._tracked(obj)]
+        changed = new + [obj for obj in session.dirty if self._tracked(obj) and session.is_modified(obj)]
+        deleted = [obj for obj in session.deleted if self._tracked(obj)]
+        if not changed and not deleted:
+            return
+        seq = self._next_seq(session)
+        for obj in changed:
+            obj.change_seq = seq
+        change_hub.record(session, [(obj.__tablename__, obj.id, "update", seq) for obj in changed if obj not in new])
+        change_hub.record(session, [(obj.__tablename__, obj.id, "delete", seq) for obj in deleted])
+        if deleted:
+            session.execute(
+                insert(Tombstone).prefix_with("OR REPLACE"),
+                [{"table_name": obj.__tablename__, "row_id": obj.id, "seq": seq} for obj in deleted],
+            )
+        if new:
+            session.info.setdefault(self._new_key, []).extend(new)
+
+    def _after_flush(self, session, flush_context):
+        new = session.info.pop(self._new_key, None)
+        if new:
+            # SQLite는 삭제된 가장 큰 id를 다시 쓸 수 있으므로, 새로 생긴 행의 예전 삭제 기록은 지웁니다.
+            session.execute(
+                delete(Tombstone).where(tuple_(Tombstone.table_name, Tombstone.row_id).in_([(obj.__tablename__, obj.id) for obj in new]))
+            )
+            change_hub.record(session, [(obj.__tablename__, obj.id, "create", obj.change_seq) for obj in new])
+
+    async def clear_tombstones(self, db: AsyncSession, table_name: str, row_ids: List[int]):
+        if row_ids:
+            await db.execute(delete(Tombstone).where(Tombstone.table_name == table_name, Tombstone.row_id.in_(row_ids)))
+
+    async def load(self, db: AsyncSession):
+        # 이 기능 이전에 만들어졌거나 외부 도구로 넣은 행은 현재 번호로 채워, 이후의 /sync 에서 한 번 전달되게 합니다.
+        seq = await db.scalar(select(TableVersion.version).where(TableVersion.name == "changes"))
+        for model in self.TABLES.values():
+            await db.execute(update(model).where(model.change_seq.is_(None)).values(change_seq=seq).execution_options(synchronize_session=False))
+        # sync_floor 보다 오래된 커서는 삭제 기록을 보장할 수 없으므로 전체 목록을 다시 받아야 합니다.
+        if await db.get(TableVersion, "sync_floor") is None:
+            db.add(TableVersion(name="sync_floor", version=seq))
+        await db.commit()
+
+change_tracker = ChangeTracker()
+
+# ====================================================================
+# 변경 알림 (Server-Sent Events)
+# ====================================================================
+class ChangeSubscriber:
+    __slots__ = ("queue", "entities", "overflowed")
+
+    def __init__(self, entities: Optional[set]):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=event_settings.queue_size)
+        self.entities = entities  # None이면 모든 테이블
+        self.overflowed = False
+
+class ChangeHub:
+    # 커밋이 끝난 변경을 열려 있는 모든 /events 연결에 나눠 줍니다.
+    # 구독자마다 크기가 제한된 큐 하나만 두므로 대기 중인 연결은 거의 자원을 쓰지 않고,
+    # 큐가 가득 찬 느린 구독자는 쓰기 요청을 막지 않도록 바로 끊습니다 (재접속 후 /sync 로 따라잡음).
+    def __init__(self):
+        self._subscribers: set = set()
+        self._pending_key = ("change_hub", id(self))
+        self.published = 0
+        self.dropped = 0
+        event.listen(Session, "after_commit", self._publish_pending)
+        event.listen(Session, "after_rollback", self._discard)
+
+    def record(self, session, changes: List[tuple]):
+        # (테이블, id, 작업, 변경 번호)를 트랜잭션에 모아 두었다가 커밋된 뒤에만 내보냅니다.
+        # 구독자가 없으면 아무것도 모으지 않습니다 (막 접속한 클라이언트는 hello의 seq로 /sync 를 호출함).
+        if changes and self._subscribers:
+            session.info.setdefault(self._pending_key, []).extend(changes)
+
+    def _publish_pending(self, session):
+        changes = session.info.pop(self._pending_key, None)
+        if changes:
+            self.publish(changes)
+
+    def _discard(self, session):
+        session.info.pop(self._pending_key, None)
+
+    def publish(self, changes: List[tuple]):
+        # 이벤트 문자열은 한 번만 만들고 모든 구독자가 같은 객체를 공유합니다.
+        frames = [
+            (entity, f'id: {seq}\nevent: change\ndata: {json.dumps({"entity": entity, "id": row_id, "op": op, "seq": seq}, separators=(",", ":"))}\n\n')
+            for entity, row_id, op, seq in changes
+        ]
+        self.published += len(frames)
+        for subscriber in list(self._subscribers):
+            for entity, frame in frames:
+                if subscriber.entities is not None and entity not in subscriber.entities:
+                    continue
+                try:
+                    subscriber.queue.put_nowait(frame)
+                except asyncio.QueueFull:
+                    self._drop(subscriber)
+                    break
+
+    def _drop(self, subscriber: ChangeSubscriber):
+        self._subscribers.discard(subscriber)
+        self.dropped += 1
+        subscriber.overflowed = True
+        self._close(subscriber)
+
+    def _close(self, subscriber: ChangeSubscriber):
+        # 쌓인 이벤트를 버리고 종료 표시(None)를 넣어 스트림이 곧바로 끝나게 합니다.
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(None)
+
+    def is_full(self) -> bool:
+        return len(self._subscribers) >= event_settings.max_subscribers
+
+    async def stream(self, entities: Optional[set]):
+        subscriber = ChangeSubscriber(entities)
+        self._subscribers.add(subscriber)
+        try:
+            hello = json.dumps({"seq": table_versions.version("changes")})
+            yield f"retry: 3000\nevent: hello\ndata: {hello}\n\n"
+            while True:
+                try:
+                    frame = await asyncio.wait_for(subscriber.queue.get(), event_settings.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                # 이미 도착해 있는 이벤트는 한 번에 묶어 보냅니다.
+                frames = [frame]
+                while frame is not None and not subscriber.queue.empty():
+                    frame = subscriber.queue.get_nowait()
+                    frames.append(frame)
+                if frames[-1] is None:
+                    if subscriber.overflowed:
+                        yield "event: resync\ndata: {}\n\n"
+                    return
+                yield "".join(frames)
+        finally:
+            self._subscribers.discard(subscriber)
+
+    def close(self):
+        for subscriber in list(self._subscribers):
+            self._subscribers.discard(subscriber)
+            self._close(subscriber)
+
+    def stats(self) -> Dict[str, int]:
+        return {"subscribers": len(self._subscribers), "published": self.published, "dropped": self.dropped}
+
+change_hub = ChangeHub()
+
+def conditional_response(name: str, if_none_match: Optional[str]):
+    # If-None-Match가 현재 ETag와 같으면 ORM을 거치지 않고 바로 304를 돌려줍니다.
+    etag = table_versions.etag(name)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match and (if_none_match.strip() == "*" or etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))):
+        return etag, Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return etag, None
+
+def set_etag_headers(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+
 # ====================================================================
 # CRUD 함수
 # ====================================================================
-def get_students(db: Session):
-    return db.query(Student).all()
+def _filter_roster(
+    query,
+    grade: Optional[int] = None,
+    class_num: Optional[int] = None,
+    name_prefix: Optional[str] = None,
+    after: Optional[tuple] = None,
+    limit: Optional[int] = None,
+):
+    if grade is not None:
+        query = query.where(Student.grade == grade)
+    if class_num is not None:
+        query = query.where(Student.class_num == class_num)
+    if name_prefix:
+        # LIKE 대신 범위 조건을 사용해야 name 인덱스를 탈 수 있습니다.
+        query = query.where(Student.name >= name_prefix, Student.name < name_prefix + "\U0010ffff")
+    roster_key = tuple_(Student.grade, Student.class_num, Student.student_num, Student.id)
+    if after is not None:
+        query = query.where(roster_key > tuple_(*after))
+    query = query.order_by(Student.grade, Student.class_num, Student.student_num, Student.id)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+async def get_students(db: AsyncSession, **filters):
+    query = select(Student).options(selectinload(Student.consultations))
+    return (await db.scalars(_filter_roster(query, **filters))).all()
+
+async def get_student_summaries(db: AsyncSession, **filters):
+    # 목록에 필요한 컬럼만 SELECT 하므로 상담 기록과 연락처는 읽지도 않습니다.
+    query = select(*(getattr(Student, field) for field in StudentSummary.model_fields))
+    return (await db.execute(_filter_roster(query, **filters))).all()
+
+def _student_json_query():
+    # StudentSchema 모양의 JSON을 SQLite(JSON1)가 직접 만들어 돌려줍니다.
+    # 저장할 때 이미 검증한 값이므로 읽을 때는 ORM 객체나 Pydantic 모델을 거치지 않고 문자열을 그대로 이어 붙입니다.
+    ordered = (
+        select(ConsultationRecord.date, ConsultationRecord.content)
+        .where(ConsultationRecord.student_id == Student.id)
+        .correlate(Student)
+        .order_by(ConsultationRecord.date, ConsultationRecord.id)
+        .subquery("ordered")
+    )
+    consultations_json = select(
+        func.json_group_array(func.json_object("date", ordered.c.date, "content", ordered.c.content))
+    ).scalar_subquery()
+    fields = []
+    for field in StudentSchema.model_fields:
+        fields += [literal(field), func.json(consultations_json) if field == "consultations" else getattr(Student, field)]
+    return select(func.json_object(*fields).label("student_json"), Student.grade, Student.class_num, Student.student_num, Student.id)
+
+async def get_students_json(db: AsyncSession, **filters):
+    return (await db.execute(_filter_roster(_student_json_query(), **filters))).all()
 
-def get_student_by_id(db: Session, student_id: int):
-    return db.query(Student).filter(Student.id == student_id).first()
+async def get_student_json(db: AsyncSession, student_id: int) -> Optional[str]:
+    return await db.scalar(_student_json_query().where(Student.id == student_id))
 
-def create_student(db: Session, student: StudentCreate):
-    db_student = Student(**student.model_dump(), consultations=json.dumps([]))
+async def get_changed_rows(db: AsyncSession, model, since: Optional[int]):
+    # since가 None이면 전체 행을 돌려줍니다 (/sync 전체 동기화). change_seq 인덱스 순서로 읽어 정렬 단계를 생략합니다.
+    query = select(model).order_by(model.change_seq, model.id)
+    if since is not None:
+        query = query.where(model.change_seq > since)
+    return (await db.scalars(query)).all()
+
+async def get_changed_students_json(db: AsyncSession, since: Optional[int]) -> List[str]:
+    query = _student_json_query().order_by(Student.change_seq, Student.id)
+    if since is not None:
+        query = query.where(Student.change_seq > since)
+    return list(await db.scalars(query))
+
+async def get_deleted_ids(db: AsyncSession, table_name: str, since: int) -> List[int]:
+    query = select(Tombstone.row_id).where(Tombstone.table_name == table_name, Tombstone.seq > since).order_by(Tombstone.row_id)
+    return list(await db.scalars(query))
+
+def encode_roster_cursor(student) -> str:
+    return f"{student.grade}.{student.class_num}.{student.student_num}.{student.id}"
+
+def decode_roster_cursor(cursor: str) -> tuple:
+    grade, class_num, student_num, student_id = (int(part) for part in cursor.split("."))
+    return grade, class_num, student_num, student_id
+
+async def get_student_by_id(db: AsyncSession, student_id: int):
+    # 비동기 세션에서는 지연 로딩을 쓸 수 없으므로 상담 기록을 함께 읽어 둡니다.
+    return await db.get(Student, student_id, options=[selectinload(Student.consultations)])
+
+async def create_student(db: AsyncSession, student: StudentCreate):
+    db_student = Student(**student.model_dump(), consultations=[])
     db.add(db_student)
-    db.commit()
-    db.refresh(db_student)
+    await table_versions.bump(db, "students")
+    await db.commit()
+    student_name_index.add(db_student)
     return db_student
 
-def update_student(db: Session, student_id: int, updated_student: StudentUpdate):
-    db_student = get_student_by_id(db, student_id)
+async def create_students_bulk(db: AsyncSession, students: List[StudentCreate]):
+    # 한 트랜잭션 안에서 executemany 방식으로 일괄 삽입하고 생성된 행을 돌려받습니다.
+    if not students:
+        return []
+    rows = [s.model_dump() for s in students]
+    seq = await change_tracker.next_seq(db)
+    for row in rows:
+        row["change_seq"] = seq
+    student_ids = list(await db.scalars(insert(Student).returning(Student.id), rows))
+    await change_tracker.clear_tombstones(db, "students", student_ids)
+    change_hub.record(db, [("students", student_id, "create", seq) for student_id in student_ids])
+    await table_versions.bump(db, "students")
+    await db.commit()
+    query = (
+        select(Student)
+        .options(selectinload(Student.consultations))
+        .where(Student.id.in_(student_ids))
+        .order_by(Student.id)
+    )
+    created = (await db.scalars(query)).all()
+    for db_student in created:
+        student_name_index.add(db_student)
+    return created
+
+async def update_student(db: AsyncSession, student_id: int, updated_student: StudentUpdate):
+    db_student = await get_student_by_id(db, student_id)
     if db_student:
         for key, value in updated_student.model_dump().items():
             setattr(db_student, key, value)
-        db.commit()
-        db.refresh(db_student)
+        await table_versions.bump(db, "students")
+        await db.commit()
+        student_name_index.add(db_student)
     return db_student
 
-def delete_student(db: Session, student_id: int):
-    db_student = get_student_by_id(db, student_id)
+async def delete_student(db: AsyncSession, student_id: int):
+    db_student = await get_student_by_id(db, student_id)
     if db_student:
-        db.delete(db_student)
-        db.commit()
+        await unindex_consultations(db, [c.id for c in db_student.consultations])
+        await db.delete(db_student)
+        await table_versions.bump(db, "students")
+        await db.commit()
+        student_name_index.remove(student_id)
         return True
     return False
 
-def delete_all_students(db: Session):
-    db.query(Student).delete()
-    db.commit()
+async def delete_all_students(db: AsyncSession):
+    await db.execute(text("DELETE FROM consultations_fts"))
+    seq = await change_tracker.next_seq(db)
+    await db.execute(
+        insert(Tombstone)
+        .prefix_with("OR REPLACE")
+        .from_select(["table_name", "row_id", "seq"], select(literal("students"), Student.id, literal(seq)))
+    )
+    await db.execute(delete(ConsultationRecord))
+    await db.execute(delete(Student))
+    change_hub.record(db, [("students", None, "delete_all", seq)])
+    await table_versions.bump(db, "students")
+    await db.commit()
+    student_name_index.clear()
     return True
 
-def add_consultation(db: Session, student_id: int, consultation: Consultation):
-    db_student = get_student_by_id(db, student_id)
+async def add_consultation(db: AsyncSession, student_id: int, consultation: Consultation):
+    # 기존 기록을 다시 쓰지 않고 새 행 하나만 추가합니다.
+    db_student = await get_student_by_id(db, student_id)
     if db_student:
-        consultations = json.loads(db_student.consultations)
-        consultations.append(consultation.model_dump())
-        db_student.consultations = json.dumps(consultations)
-        db.commit()
-        db.refresh(db_student)
+        db_record = ConsultationRecord(**consultation.model_dump())
+        db_student.consultations.append(db_record)
+        await db.flush()
+        await index_consultation(db, db_record)
+        await table_versions.bump(db, "students")
+        await db.commit()
     return db_student
 
-def get_work_logs(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(WorkLog).offset(skip).limit(limit).all()
+async def student_exists(db: AsyncSession, student_id: int) -> bool:
+    # 기본 키만 확인하므로 상담 기록을 읽지 않습니다.
+    return await db.scalar(select(Student.id).where(Student.id == student_id)) is not None
 
-def get_work_log_by_date(db: Session, log_date: date):
-    return db.query(WorkLog).filter(WorkLog.date == log_date).first()
+async def get_consultations(db: AsyncSession, student_id: int, skip: int = 0, limit: int = 100):
+    query = (
+        select(ConsultationRecord)
+        .where(ConsultationRecord.student_id == student_id)
+        .order_by(ConsultationRecord.date, ConsultationRecord.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return (await db.scalars(query)).all()
 
-def create_work_log(db: Session, work_log: WorkLogCreate):
-    db_log = WorkLog(date=work_log.date, content=work_log.content)
-    db.add(db_log)
-    db.commit()
-    db.refresh(db_log)
-    return db_log
+async def migrate_legacy_consultations(db: AsyncSession):
+    # students.consultations JSON 문자열에 남아 있는 기록을 consultations 테이블로 옮깁니다.
+    legacy_students = (await db.scalars(select(Student).where(Student.legacy_consultations.isnot(None)))).all()
+    for db_student in legacy_students:
+        records = json.loads(db_student.legacy_consultations or "[]")
+        if records:
+            await db.execute(
+                insert(ConsultationRecord),
+                [{"student_id": db_student.id, "date": r["date"], "content": r["content"]} for r in records],
+            )
+        db_student.legacy_consultations = None
+    if legacy_students:
+        await table_versions.bump(db, "students")
+    await db.commit()
+    return len(legacy_students)
 
-def update_work_log(db: Session, log_date: date, content: str):
-    db_log = get_work_log_by_date(db, log_date)
-    if db_log:
-        db_log.content = content
-        db.commit()
-        db.refresh(db_log)
-    return db_log
+async def get_work_logs(
+    db: AsyncSession,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    after: Optional[date] = None,
+    limit: Optional[int] = None,
+    descending: bool = False,
+):
+    # 날짜 범위와 날짜 커서(after: 이전 페이지의 마지막 날짜) 모두 work_logs.date 유니크 인덱스로 찾으므로
+    # OFFSET처럼 앞쪽 행을 모두 읽고 버리지 않습니다. limit을 생략하면 범위 안의 모든 일지를 돌려줍니다.
+    query = select(WorkLog).order_by(WorkLog.date.desc() if descending else WorkLog.date)
+    if date_from is not None:
+        query = query.where(WorkLog.date >= date_from)
+    if date_to is not None:
+        query = query.where(WorkLog.date <= date_to)
+    if after is not None:
+        query = query.where(WorkLog.date < after if descending else WorkLog.date > after)
+    if limit is not None:
+        query = query.limit(limit)
+    return (await db.scalars(query)).all()
+
+def month_range(year: int, month: int) -> tuple:
+    # [해당 월 1일, 다음 달 1일)
+    return date(year, month, 1), date(year + month // 12, month % 12 + 1, 1)
 
-def delete_work_log(db: Session, log_date: date):
-    db_log = get_work_log_by_date(db, log_date)
+async def get_work_log_calendar(db: AsyncSession, year: int, month: int, preview_chars: int = 40):
+    # 미리보기는 SQLite 안에서 잘라 오므로 긴 본문을 파이썬으로 읽어 들이지 않습니다.
+    first_day, next_first_day = month_range(year, month)
+    query = (
+        select(WorkLog.date, func.replace(func.substr(WorkLog.content, 1, preview_chars), "\n", " ").label("preview"))
+        .where(WorkLog.date >= first_day, WorkLog.date < next_first_day)
+        .order_by(WorkLog.date)
+    )
+    return (await db.execute(query)).all()
+
+async def get_work_log_by_date(db: AsyncSession, log_date: date):
+    return await db.scalar(select(WorkLog).where(WorkLog.date == log_date))
+
+async def upsert_work_logs(db: AsyncSession, work_logs: List[WorkLogCreate]) -> tuple:
+    # INSERT ... ON CONFLICT(date) DO UPDATE 한 문장으로 저장하므로 미리 조회할 필요가 없고,
+    # 두 탭이 같은 날짜를 동시에 저장해도 유니크 제약 오류 대신 나중 저장이 이깁니다.
+    # ORM을 거치지 않으므로 변경 번호, 삭제 기록, 변경 알림, 검색 색인을 직접 처리합니다.
+    # (생성된 행 목록, 수정된 행 목록)을 돌려줍니다.
+    if not work_logs:
+        return [], []
+    # 한 문장 안에서 같은 행을 두 번 고칠 수 없으므로 같은 날짜는 마지막 내용만 남깁니다.
+    contents = {log.date: log.content for log in work_logs}
+    seq = await change_tracker.next_seq(db)
+    # 새 행의 rowid는 항상 현재 최대 id보다 크므로, 이 값으로 생성과 수정을 구분합니다.
+    max_id = await db.scalar(select(func.max(WorkLog.id))) or 0
+    statement = sqlite_insert(WorkLog)
+    statement = statement.on_conflict_do_update(
+        index_elements=[WorkLog.date],
+        set_={"content": statement.excluded.content, "change_seq": statement.excluded.change_seq},
+    )
+    rows = (
+        await db.execute(
+            statement.returning(WorkLog.id, WorkLog.date, WorkLog.content, sort_by_parameter_order=True),
+            [{"date": log_date, "content": content, "change_seq": seq} for log_date, content in contents.items()],
+        )
+    ).all()
+    created = [row for row in rows if row.id > max_id]
+    updated = [row for row in rows if row.id <= max_id]
+    await index_work_logs(db, rows)
+    await change_tracker.clear_tombstones(db, "work_logs", [row.id for row in created])
+    change_hub.record(db, [("work_logs", row.id, "create", seq) for row in created])
+    change_hub.record(db, [("work_logs", row.id, "update", seq) for row in updated])
+    await table_versions.bump(db, "work_logs")
+    await db.commit()
+    return created, updated
+
+async def delete_work_log(db: AsyncSession, log_date: date):
+    db_log = await get_work_log_by_date(db, log_date)
     if db_log:
-        db.delete(db_log)
-        db.commit()
+        await unindex_work_log(db, db_log.id)
+        # 처리한 문단 기록도 지워야 같은 내용을 다시 쓰고 추출할 때 문단이 건너뛰어지지 않습니다.
+        await db.execute(delete(WorkLogSegment).where(WorkLogSegment.log_date == log_date))
+        await db.delete(db_log)
+        await table_versions.bump(db, "work_logs")
+        await db.commit()
         return True
     return False
 
-def get_todo_items(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(ToDoItem).offset(skip).limit(limit).all()
+async def get_todo_items(db: AsyncSession, skip: int = 0, limit: int = 100):
+    return (await db.scalars(select(ToDoItem).offset(skip).limit(limit))).all()
 
-def get_todo_item(db: Session, todo_id: int):
-    return db.query(ToDoItem).filter(ToDoItem.id == todo_id).first()
+async def get_todo_item(db: AsyncSession, todo_id: int):
+    return await db.get(ToDoItem, todo_id)
 
-def create_todo_item(db: Session, item: ToDoItemCreate):
+async def create_todo_item(db: AsyncSession, item: ToDoItemCreate):
     db_item = ToDoItem(content=item.content, is_completed=item.is_completed)
     db.add(db_item)
-    db.commit()
-    db.refresh(db_item)
+    await table_versions.bump(db, "todos")
+    await db.commit()
     return db_item
 
-def update_todo_item(db: Session, todo_id: int, item: ToDoItemUpdate):
-    db_item = get_todo_item(db, todo_id)
+async def update_todo_item(db: AsyncSession, todo_id: int, item: ToDoItemUpdate):
+    db_item = await get_todo_item(db, todo_id)
     if db_item:
         if item.content is not None:
             db_item.content = item.content
         if item.is_completed is not None:
             db_item.is_completed = item.is_completed
-        db.commit()
-        db.refresh(db_item)
+        await table_versions.bump(db, "todos")
+        await db.commit()
     return db_item
 
-def delete_todo_item(db: Session, todo_id: int):
-    db_item = get_todo_item(db, todo_id)
+async def delete_todo_item(db: AsyncSession, todo_id: int):
+    db_item = await get_todo_item(db, todo_id)
     if db_item:
-        db.delete(db_item)
-        db.commit()
+        await db.delete(db_item)
+        await table_versions.bump(db, "todos")
+        await db.commit()
         return True
     return False
 
+# 아래 일괄 함수들은 ORM을 거치지 않고 한 문장씩 실행하므로 변경 번호, 삭제 기록, 변경 알림을 직접 남깁니다.
+async def create_todo_items(db: AsyncSession, items: List[ToDoItemCreate], source_date: Optional[date] = None):
+    # executemany 방식의 INSERT ... RETURNING 한 번으로 모두 추가합니다.
+    if not items:
+        return []
+    seq = await change_tracker.next_seq(db)
+    rows = [dict(item.model_dump(), change_seq=seq, source_date=source_date) for item in items]
+    created = list(await db.scalars(insert(ToDoItem).returning(ToDoItem, sort_by_parameter_order=True), rows))
+    todo_ids = [item.id for item in created]
+    await change_tracker.clear_tombstones(db, "todos", todo_ids)
+    change_hub.record(db, [("todos", todo_id, "create", seq) for todo_id in todo_ids])
+    await table_versions.bump(db, "todos")
+    await db.commit()
+    return created
+
+def split_log_segments(content: str) -> List[tuple]:
+    # 업무일지를 빈 줄 기준 문단으로 나눠 (해시, 문단) 목록으로 돌려줍니다. 공백만 다른 문단은 같은 문단으로 봅니다.
+    segments = {}
+    for paragraph in re.split(r"\n\s*\n", content):
+        normalized = " ".join(paragraph.split())
+        if normalized:
+            segments.setdefault(hashlib.sha256(normalized.encode("utf-8")).hexdigest(), paragraph.strip())
+    return list(segments.items())
+
+def normalize_todo_content(content: str) -> str:
+    # 중복 비교용: 앞의 "-" 목록 기호와 공백 차이는 무시합니다.
+    return " ".join(content.strip().lstrip("-•").split())
+
+async def get_processed_segment_hashes(db: AsyncSession, log_date: date) -> set:
+    return set(await db.scalars(select(WorkLogSegment.content_hash).where(WorkLogSegment.log_date == log_date)))
+
+async def mark_segments_processed(db: AsyncSession, log_date: date, content_hashes: List[str]):
+    if content_hashes:
+        await db.execute(
+            insert(WorkLogSegment).prefix_with("OR IGNORE"),
+            [{"log_date": log_date, "content_hash": content_hash} for content_hash in content_hashes],
+        )
+
+async def get_extracted_todo_keys(db: AsyncSession, log_date: date) -> set:
+    # 그 날짜의 업무일지에서 이미 추출한 할 일 (완료 여부와 관계없이)
+    contents = await db.scalars(select(ToDoItem.content).where(ToDoItem.source_date == log_date))
+    return {normalize_todo_content(content) for content in contents}
+
+def _todo_selection(ids: Optional[List[int]], status_filter: Optional[str]) -> list:
+    if ids is not None:
+        return [ToDoItem.id.in_(ids)]
+    if status_filter == "completed":
+        return [ToDoItem.is_completed.is_(True)]
+    if status_filter == "active":
+        return [ToDoItem.is_completed.isnot(True)]
+    return []
+
+async def set_todo_items_completed(db: AsyncSession, is_completed: bool, ids: Optional[List[int]] = None, status_filter: Optional[str] = None) -> List[int]:
+    # 이미 같은 상태인 할 일은 건드리지 않으므로 변경 번호도 실제로 바뀐 행에만 붙습니다.
+    seq = await change_tracker.next_seq(db)
+    changed_ids = list(
+        await db.scalars(
+            update(ToDoItem)
+            .where(*_todo_selection(ids, status_filter), ToDoItem.is_completed.isnot(is_completed))
+            .values(is_completed=is_completed, change_seq=seq)
+            .returning(ToDoItem.id)
+            .execution_options(synchronize_session=False)
+        )
+    )
+    if not changed_ids:
+        await db.rollback()
+        return []
+    change_hub.record(db, [("todos", todo_id, "update", seq) for todo_id in changed_ids])
+    await table_versions.bump(db, "todos")
+    await db.commit()
+    return changed_ids
+
+async def delete_todo_items(db: AsyncSession, ids: Optional[List[int]] = None, status_filter: Optional[str] = None) -> List[int]:
+    deleted_ids = list(
+        await db.scalars(
+            delete(ToDoItem).where(*_todo_selection(ids, status_filter)).returning(ToDoItem.id).execution_options(synchronize_session=False)
+        )
+    )
+    if not deleted_ids:
+        await db.rollback()
+        return []
+    seq = await change_tracker.next_seq(db)
+    await db.execute(
+        insert(Tombstone).prefix_with("OR REPLACE"),
+        [{"table_name": "todos", "row_id": todo_id, "seq": seq} for todo_id in deleted_ids],
+    )
+    change_hub.record(db, [("todos", todo_id, "delete", seq) for todo_id in deleted_ids])
+    await table_versions.bump(db, "todos")
+    await db.commit()
+    return deleted_ids
+
+# ====================================================================
+# 전문 검색 (SQLite FTS5, 상담 기록 + 업무일지)
+# ====================================================================
+# unicode61 토크나이저는 공백과 문장부호로만 단어를 나누므로 "따돌림을"처럼 조사가 붙은 한국어는
+# "따돌림"으로 찾을 수 없고, trigram 토크나이저는 두 글자 검색어("폭력", "지각")를 찾지 못합니다.
+# 그래서 한글은 두 글자씩 겹쳐 자른(bigram) 토큰으로 색인하고, 검색어도 같은 방식으로 잘라 구(phrase)로 찾습니다.
+SEARCH_TABLES = {"consultation": "consultations_fts", "work_log": "work_logs_fts"}
+SEARCH_SNIPPET_CHARS = 80
+HANGUL_RUN = re.compile(r"([가-힣]+)")
+SEARCH_WORD = re.compile(r"\w+")
+
+def _search_word_tokens(word: str) -> List[str]:
+    tokens = []
+    for part in HANGUL_RUN.split(word):
+        if not part:
+            continue
+        if HANGUL_RUN.fullmatch(part) and len(part) > 1:
+            tokens.extend(part[i:i + 2] for i in range(len(part) - 1))
+        else:
+            tokens.append(part)
+    return tokens
+
+def to_search_tokens(content: str) -> str:
+    return " ".join(token for word in SEARCH_WORD.findall(content.lower()) for token in _search_word_tokens(word))
+
+def build_search_query(q: str) -> Optional[str]:
+    clauses = []
+    for word in SEARCH_WORD.findall(q.lower()):
+        tokens = _search_word_tokens(word)
+        if len(tokens) == 1:
+            # 한 글자 한글이나 영문/숫자는 앞부분 일치로 찾습니다.
+            clauses.append(f'"{tokens[0]}"*')
+        else:
+            clauses.append('"' + " ".join(tokens) + '"')
+    return " AND ".join(clauses) or None
+
+def make_search_snippet(content: str, q: str) -> tuple:
+    words = SEARCH_WORD.findall(q.lower())
+    lowered = content.lower()
+    positions = [lowered.find(w) for w in words if lowered.find(w) >= 0]
+    start = max(0, min(positions) - SEARCH_SNIPPET_CHARS // 3) if positions else 0
+    end = min(len(content), start + SEARCH_SNIPPET_CHARS)
+    prefix = "…" if start > 0 else ""
+    snippet = prefix + content[start:end] + ("…" if end < len(content) else "")
+    highlights = []
+    window = lowered[start:end]
+    for w in words:
+        found = window.find(w)
+        while found >= 0:
+            highlights.append([len(prefix) + found, len(prefix) + found + len(w)])
+            found = window.find(w, found + len(w))
+    return snippet, sorted(highlights)
+
+def _create_search_tables(connection):
+    for table in SEARCH_TABLES.values():
+        connection.exec_driver_sql(f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5(body, tokenize='unicode61')")
+
+async def index_consultation(db: AsyncSession, db_record: ConsultationRecord):
+    await db.execute(
+        text("INSERT OR REPLACE INTO consultations_fts(rowid, body) VALUES (:id, :body)"),
+        {"id": db_record.id, "body": to_search_tokens(db_record.content)},
+    )
+
+async def unindex_consultations(db: AsyncSession, record_ids: List[int]):
+    if record_ids:
+        await db.execute(text("DELETE FROM consultations_fts WHERE rowid = :id"), [{"id": i} for i in record_ids])
+
+async def index_work_logs(db: AsyncSession, logs):
+    # id와 content만 있으면 되므로 ORM 객체와 RETURNING 행 모두 받습니다.
+    await db.execute(
+        text("INSERT OR REPLACE INTO work_logs_fts(rowid, body) VALUES (:id, :body)"),
+        [{"id": log.id, "body": to_search_tokens(log.content or "")} for log in logs],
+    )
+
+async def unindex_work_log(db: AsyncSession, log_id: int):
+    await db.execute(text("DELETE FROM work_logs_fts WHERE rowid = :id"), {"id": log_id})
+
+async def sync_search_index(db: AsyncSession):
+    # 색인 행 수가 원본과 다르면(첫 실행, 마이그레이션, 외부 도구로 넣은 데이터) 전체를 다시 만듭니다.
+    rebuilt = 0
+    for model, table in ((ConsultationRecord, "consultations_fts"), (WorkLog, "work_logs_fts")):
+        source_count = await db.scalar(select(func.count()).select_from(model))
+        index_count = await db.scalar(text(f"SELECT count(*) FROM {table}"))
+        if source_count == index_count:
+            continue
+        await db.execute(text(f"DELETE FROM {table}"))
+        rows = (await db.execute(select(model.id, model.content))).all()
+        if rows:
+            await db.execute(
+                text(f"INSERT INTO {table}(rowid, body) VALUES (:id, :body)"),
+                [{"id": row_id, "body": to_search_tokens(content or "")} for row_id, content in rows],
+            )
+        rebuilt += source_count
+    await db.commit()
+    return rebuilt
+
+async def search_records(
+    db: AsyncSession,
+    q: str,
+    kinds: List[str],
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = 20,
+) -> List[SearchHit]:
+    match_query = build_search_query(q)
+    if match_query is None:
+        return []
+    params = {
+        "q": match_query,
+        "limit": limit,
+        "date_from": date_from.isoformat() if date_from else None,
+        "date_to": date_to.isoformat() if date_to else None,
+    }
+    # 날짜는 두 테이블 모두 'YYYY-MM-DD' 문자열로 저장되어 있어 그대로 비교할 수 있습니다.
+    date_filter = " AND (:date_from IS NULL OR source.date >= :date_from) AND (:date_to IS NULL OR source.date <= :date_to)"
+    hits = []
+    if "consultation" in kinds:
+        rows = await db.execute(text(
+            "SELECT source.id, source.date, source.content, s.id, s.name, consultations_fts.rank "
+            "FROM consultations_fts "
+            "JOIN consultations AS source ON source.id = consultations_fts.rowid "
+            "JOIN students AS s ON s.id = source.student_id "
+            "WHERE consultations_fts MATCH :q" + date_filter + " ORDER BY consultations_fts.rank LIMIT :limit"
+        ), params)
+        for record_id, record_date, content, student_id, student_name, score in rows:
+            snippet, highlights = make_search_snippet(content, q)
+            hits.append(SearchHit(
+                kind="consultation", id=record_id, date=record_date, snippet=snippet, highlights=highlights,
+                score=score, student_id=student_id, student_name=student_name,
+            ))
+    if "work_log" in kinds:
+        rows = await db.execute(text(
+            "SELECT source.id, source.date, source.content, work_logs_fts.rank "
+            "FROM work_logs_fts "
+            "JOIN work_logs AS source ON source.id = work_logs_fts.rowid "
+            "WHERE work_logs_fts MATCH :q" + date_filter + " ORDER BY work_logs_fts.rank LIMIT :limit"
+        ), params)
+        for log_id, log_date, content, score in rows:
+            snippet, highlights = make_search_snippet(content or "", q)
+            hits.append(SearchHit(kind="work_log", id=log_id, date=str(log_date), snippet=snippet, highlights=highlights, score=score))
+    hits.sort(key=lambda hit: hit.score)
+    return hits[:limit]
+
+# ====================================================================
+# 학생 이름 빠른 검색 (초성 / 접두어 / 부분 문자열, 메모리 색인)
+# ====================================================================
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+
+def to_choseong(text_value: str) -> str:
+    # 완성형 한글은 초성으로 바꾸고, 이미 자모이거나 한글이 아닌 글자는 그대로 둡니다.
+    return "".join(
+        CHOSEONG[(ord(ch) - 0xAC00) // 588] if "가" <= ch <= "힣" else ch
+        for ch in text_value
+    )
+
+def _substrings(value: str):
+    return {value[i:j] for i in range(len(value)) for j in range(i + 1, len(value) + 1)}
+
+def _prefixes(value: str):
+    return {value[:i] for i in range(1, len(value) + 1)}
+
+class StudentNameIndex:
+    # 학생 이름은 몇 글자뿐이라 모든 접두어와 부분 문자열을 키로 미리 색인해 둡니다.
+    # 각 키의 목록은 (학년, 반, 번호, id) 순으로 정렬되어 있어 limit 개를 채우면 바로 멈출 수 있습니다.
+    def __init__(self):
+        self._students: Dict[int, dict] = {}  # id -> StudentSummary 모양의 dict
+        self._keys: Dict[int, tuple] = {}  # id -> (정렬 키, 이름, 초성)
+        self._name_prefix: Dict[str, list] = {}
+        self._name_substring: Dict[str, list] = {}
+        self._choseong_prefix: Dict[str, list] = {}
+        self._choseong_substring: Dict[str, list] = {}
+
+    @staticmethod
+    def _insert(table: Dict[str, list], keys, roster_key: tuple):
+        for key in keys:
+            bisect.insort(table.setdefault(key, []), roster_key)
+
+    @staticmethod
+    def _delete(table: Dict[str, list], keys, roster_key: tuple):
+        for key in keys:
+            entries = table.get(key)
+            if entries is None:
+                continue
+            position = bisect.bisect_left(entries, roster_key)
+            if position < len(entries) and entries[position] == roster_key:
+                del entries[position]
+            if not entries:
+                del table[key]
+
+    def add(self, student):
+        self.remove(student.id)
+        name = "".join((student.name or "").split()).lower()
+        choseong = to_choseong(name)
+        roster_key = (student.grade or 0, student.class_num or 0, student.student_num or 0, student.id)
+        self._students[student.id] = {field: getattr(student, field) for field in StudentSummary.model_fields}
+        self._keys[student.id] = (roster_key, name, choseong)
+        self._insert(self._name_prefix, _prefixes(name), roster_key)
+        self._insert(self._name_substring, _substrings(name), roster_key)
+        self._insert(self._choseong_prefix, _prefixes(choseong), roster_key)
+        self._insert(self._choseong_substring, _substrings(choseong), roster_key)
+
+    def remove(self, student_id: int):
+        keys = self._keys.pop(student_id, None)
+        if keys is None:
+            return
+        roster_key, name, choseong = keys
+        self._students.pop(student_id, None)
+        self._delete(self._name_prefix, _prefixes(name), roster_key)
+        self._delete(self._name_substring, _substrings(name), roster_key)
+        self._delete(self._choseong_prefix, _prefixes(choseong), roster_key)
+        self._delete(self._choseong_substring, _substrings(choseong), roster_key)
+
+    def clear(self):
+        self.__init__()
+
+    async def rebuild(self, db: AsyncSession):
+        self.clear()
+        rows = await db.execute(select(*(getattr(Student, field) for field in StudentSummary.model_fields)))
+        for row in rows:
+            self.add(row)
+        return len(self._students)
+
+    def _matches(self, student_id: int, query: str, prefix_only: bool) -> bool:
+        # "김ㅁ"처럼 완성형과 초성이 섞인 입력은 초성 색인으로 찾은 후보를 글자별로 다시 확인합니다.
+        name = self._keys[student_id][1]
+        starts = range(1) if prefix_only else range(len(name) - len(query) + 1)
+        return any(
+            all(ch == name[i + offset] or ch == to_choseong(name[i + offset]) for offset, ch in enumerate(query))
+            for i in starts
+        )
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        query = "".join(query.split()).lower()
+        if not query:
+            return []
+        if any(ch in CHOSEONG for ch in query):
+            key = to_choseong(query)
+            tables = (self._choseong_prefix, self._choseong_substring)
+            verify = any(ch not in CHOSEONG for ch in query)
+        else:
+            key = query
+            tables = (self._name_prefix, self._name_substring)
+            verify = False
+        # 이름이 검색어로 시작하는 학생을 먼저, 그다음 이름 중간에 포함된 학생을 학년/반/번호 순으로 보여줍니다.
+        results, seen = [], set()
+        for prefix_only, table in zip((True, False), tables):
+            for roster_key in table.get(key, ()):
+                student_id = roster_key[-1]
+                if student_id in seen or (verify and not self._matches(student_id, query, prefix_only)):
+                    continue
+                seen.add(student_id)
+                results.append(self._students[student_id])
+                if len(results) >= limit:
+                    return results
+        return results
+
+student_name_index = StudentNameIndex()
+
+# ====================================================================
+# 명단 파일 가져오기 (스트리밍 파서 + 청크 단위 저장)
+# ====================================================================
+IMPORT_CHUNK_SIZE = 200
+IMPORT_MAX_REPORTED_ERRORS = 100
+IMPORT_STATUS_TTL_SECONDS = 24 * 3600  # 끝난 가져오기 상태를 보관하는 기간
+IMPORT_SNIFF_BYTES = 64 * 1024
+
+# 파일의 머리글(한글 또는 필드명)을 StudentBase 필드로 연결합니다.
+STUDENT_IMPORT_COLUMNS = {
+    "학년": "grade",
+    "반": "class_num",
+    "번호": "student_num",
+    "이름": "name",
+    "전화번호": "phone",
+    "주소": "address",
+    "보호자연락처1": "guardian_phone1",
+    "보호자연락처2": "guardian_phone2",
+}
+STUDENT_IMPORT_COLUMNS.update({field: field for field in StudentBase.model_fields})
+
+def _detect_text_encoding(path: str) -> str:
+    # 엑셀에서 저장한 CSV는 CP949인 경우가 많아 앞부분만 읽어 판별합니다.
+    with open(path, "rb") as f:
+        sample = f.read(IMPORT_SNIFF_BYTES)
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8-sig"
+    except UnicodeDecodeError:
+        return "cp949"
+
+def _iter_delimited_rows(path: str, delimiter: str):
+    with open(path, newline="", encoding=_detect_text_encoding(path)) as f:
+        yield from csv.reader(f, delimiter=delimiter)
+
+def _iter_xlsx_rows(path: str):
+    from openpyxl import load_workbook
+    # read_only 모드는 시트를 한 행씩 읽어 전체 통합문서를 메모리에 올리지 않습니다.
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield from workbook.worksheets[0].iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+def _read_chunk(rows, size: int):
+    return [row for _, row in zip(range(size), rows)]
+
+def iter_roster_rows(path: str, extension: str):
+    # 머리글 행을 읽은 뒤 각 행을 (파일의 행 번호, {필드명: 값}) 으로 하나씩 내보냅니다.
+    # 빈 행은 건너뛰지만 행 번호는 빈 행까지 세므로 오류 위치를 파일 그대로 가리킵니다.
+    if extension == "xlsx":
+        rows = _iter_xlsx_rows(path)
+    else:
+        rows = _iter_delimited_rows(path, "\t" if extension == "tsv" else ",")
+    header = next(rows, None)
+    if header is None:
+        return
+    fields = [STUDENT_IMPORT_COLUMNS.get(str(h).strip()) if h is not None else None for h in header]
+    for row_number, values in enumerate(rows, start=2):
+        row = {}
+        for field, value in zip(fields, values):
+            if field is None or value is None:
+                continue
+            if isinstance(value, float) and value.is_integer():
+                value = int(value)
+            value = str(value).strip()
+            if value:
+                row[field] = value
+        if row:
+            yield row_number, row
+
+def _record_import_errors(job: StudentImportStatus, index: int, row_number: int, error: ValidationError):
+    job.error_count += 1
+    if len(job.errors) < IMPORT_MAX_REPORTED_ERRORS:
+        job.errors.append(StudentImportError(index=index, row=row_number, errors=error.errors(include_url=False, include_context=False)))
+
+def _spool_upload(source, extension: str) -> str:
+    with tempfile.NamedTemporaryFile(delete=False, suffix=f".{extension}") as tmp:
+        shutil.copyfileobj(source, tmp)
+    return tmp.name
+
+async def create_student_import(db: AsyncSession, filename: str) -> StudentImportStatus:
+    now = time.time()
+    # 보관 기간이 지난 완료 기록은 새 가져오기를 시작할 때 함께 정리합니다.
+    await db.execute(delete(StudentImport).where(StudentImport.finished_at < now - IMPORT_STATUS_TTL_SECONDS))
+    job = StudentImportStatus(id=uuid.uuid4().hex, filename=filename, status="pending")
+    db.add(StudentImport(id=job.id, filename=filename, status=job.status, created_at=now))
+    await db.commit()
+    return job
+
+async def get_student_import(db: AsyncSession, job_id: str) -> Optional[StudentImportStatus]:
+    row = await db.get(StudentImport, job_id)
+    if row is None:
+        return None
+    return StudentImportStatus(
+        id=row.id,
+        filename=row.filename,
+        status=row.status,
+        processed=row.processed,
+        created=row.created,
+        error_count=row.error_count,
+        errors=json.loads(row.errors) if row.errors else [],
+        detail=row.detail,
+    )
+
+async def save_student_import(db: AsyncSession, job: StudentImportStatus, finished: bool = False):
+    values = dict(
+        status=job.status,
+        processed=job.processed,
+        created=job.created,
+        error_count=job.error_count,
+        errors=json.dumps([e.model_dump(mode="json") for e in job.errors], ensure_ascii=False),
+        detail=job.detail,
+    )
+    if finished:
+        values["finished_at"] = time.time()
+    await db.execute(update(StudentImport).where(StudentImport.id == job.id).values(**values))
+    await db.commit()
+
+async def fail_interrupted_student_imports(db: AsyncSession):
+    # 서버가 가져오기 도중에 멈췄다면 조회하는 쪽이 계속 기다리지 않도록 실패로 표시합니다.
+    now = time.time()
+    await db.execute(
+        update(StudentImport)
+        .where(StudentImport.status.in_(("pending", "running")))
+        .values(status="failed", detail="서버가 다시 시작되어 가져오기가 중단되었습니다.", finished_at=now)
+    )
+    await db.execute(delete(StudentImport).where(StudentImport.finished_at < now - IMPORT_STATUS_TTL_SECONDS))
+    await db.commit()
+
+async def run_student_import(job: StudentImportStatus, path: str, extension: str):
+    job.status = "running"
+    rows = iter_roster_rows(path, extension)
+    async with SessionLocal() as db:
+        try:
+            await save_student_import(db, job)
+            while True:
+                # 파일 읽기와 파싱은 동기 작업이므로 청크 단위로 스레드풀에서 실행합니다.
+                raw_rows = await run_in_threadpool(_read_chunk, rows, IMPORT_CHUNK_SIZE)
+                if not raw_rows:
+                    break
+                chunk = []
+                for row_number, row in raw_rows:
+                    try:
+                        chunk.append(StudentCreate.model_validate(row))
+                    except ValidationError as e:
+                        _record_import_errors(job, job.processed, row_number, e)
+                    job.processed += 1
+                job.created += len(await create_students_bulk(db, chunk))
+                await save_student_import(db, job)
+            job.status = "done"
+        except Exception as e:
+            await db.rollback()
+            logger.exception("명단 가져오기 오류")
+            job.status = "failed"
+            job.detail = str(e)
+        finally:
+            rows.close()
+            os.remove(path)
+        await save_student_import(db, job, finished=True)
+
+# ====================================================================
+# LLM 게이트웨이 (비동기 Gemini 호출 + 동시 호출 수 제한 + 타임아웃)
+# ====================================================================
+class LLMProvider(ABC):
+    name = "unknown"  # 메트릭 라벨
+
+    @abstractmethod
+    async def generate(self, contents, model: str, config) -> str:
+        ...
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+
+    def __init__(self, client):
+        self.client = client
+
+    async def generate(self, contents, model: str, config) -> str:
+        response = await self.client.aio.models.generate_content(model=model, contents=contents, config=config)
+        return response.text
+
+class SimulatedLLMError(Exception):
+    pass
+
+class SimulatedLLMProvider(LLMProvider):
+    # 네트워크와 API 키 없이 부하/지연 시간을 측정하기 위한 가짜 공급자입니다.
+    name = "simulator"
+    PHRASES = ["학생 상담 진행하기", "학부모에게 전화하기", "수업 자료 준비하기", "생활기록부 정리하기", "출결 확인하기", "교무회의 안건 정리하기"]
+
+    def __init__(self, settings: LLMSimulatorSettings):
+        self.settings = settings
+        self._random = random.Random(settings.seed)
+
+    def sample_latency(self) -> float:
+        s = self.settings
+        if s.latency == "fixed":
+            latency_ms = s.latency_ms
+        elif s.latency == "lognormal":
+            latency_ms = self._random.lognormvariate(math.log(s.latency_ms), s.latency_sigma)
+        else:
+            latency_ms = s.latency_ms * self._random.paretovariate(s.tail_alpha)
+        return min(latency_ms, s.max_latency_ms) / 1000
+
+    def _text(self) -> str:
+        phrases, length = [], 0
+        while length < self.settings.response_chars:
+            phrase = self._random.choice(self.PHRASES)
+            phrases.append(phrase)
+            length += len(phrase) + 2
+        return ", ".join(phrases)
+
+    async def generate(self, contents, model: str, config) -> str:
+        await asyncio.sleep(self.sample_latency())
+        if self._random.random() < self.settings.error_rate:
+            raise SimulatedLLMError("시뮬레이션된 LLM 호출 오류")
+        if getattr(config, "response_mime_type", None) == "application/json":
+            # 학급 단위 요약처럼 학생 번호별 JSON을 기대하는 프롬프트
+            student_ids = re.findall(r"\[학생 (\d+)\]", str(contents))
+            return json.dumps({student_id: self._text() for student_id in student_ids}, ensure_ascii=False)
+        return self._text()
+
+def create_llm_provider(settings: LLMSettings) -> Optional[LLMProvider]:
+    if settings.provider == "simulator":
+        return SimulatedLLMProvider(LLMSimulatorSettings.from_env())
+    try:
+        return GeminiProvider(genai.Client())
+    except Exception as e:
+        logger.warning("Failed to initialize Gemini client: %s", e)
+        return None
+
+class LLMGateway:
+    def __init__(self, provider: LLMProvider, max_concurrency: int, timeout_seconds: float):
+        self.provider = provider
+        self.timeout_seconds = timeout_seconds
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _generate(self, contents, model: str, config) -> str:
+        async with self._semaphore:
+            return await self.provider.generate(contents, model, config)
+
+    async def generate(self, contents, model: Optional[str] = None, config=None) -> str:
+        # 대기열에서 기다리는 시간까지 포함해 timeout_seconds를 넘기면 asyncio.TimeoutError가 발생합니다.
+        provider_name = getattr(self.provider, "name", LLMProvider.name)
+        llm_prompt_chars.observe(len(contents) if isinstance(contents, str) else len(str(contents)), provider_name)
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response_text = await asyncio.wait_for(
+                self._generate(contents, model or llm_settings.model, config),
+                timeout=self.timeout_seconds,
+            )
+            outcome = "ok"
+            llm_response_chars.observe(len(response_text or ""), provider_name)
+            return response_text
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            raise
+        finally:
+            llm_requests_total.inc(provider_name, outcome)
+            llm_request_seconds.observe(time.perf_counter() - started, provider_name)
+
+# ====================================================================
+# 상담 요약 캐시 (메모리 LRU + SQLite 영구 저장)
+# ====================================================================
+# 요약 프롬프트를 바꾸면 이 값을 올려 기존 캐시가 재사용되지 않게 합니다.
+SUMMARY_PROMPT_VERSION = "1"
+
+def build_summary_prompt(consultations: List[Consultation]) -> str:
+    consultation_text = ""
+    for c in consultations:
+        consultation_text += f"날짜: {c.date}\n내용: {c.content}\n---\n"
+    return f"""
+        다음은 학생의 상담 기록이야. 이 기록 전체에서 가장 중요한 핵심 내용과 주요 변화를 3~4줄로 간결하게 요약해줘.
+        
+        상담 기록:
+        "{consultation_text}"
+        """
+
+class SummaryCache:
+    def __init__(self, settings: SummaryCacheSettings):
+        self.settings = settings
+        self._memory: OrderedDict = OrderedDict()  # key -> (expires_at, summary)
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(consultations: List[Consultation], model: str) -> str:
+        # 공백과 순서 차이는 같은 기록으로 보고, 내용이 하나라도 바뀌면 다른 키가 됩니다.
+        normalized = sorted((c.date.strip(), " ".join(c.content.split())) for c in consultations)
+        payload = json.dumps(
+            {"prompt_version": SUMMARY_PROMPT_VERSION, "model": model, "consultations": normalized},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, expires_at: float, summary: str):
+        self._memory[key] = (expires_at, summary)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.settings.memory_entries:
+            self._memory.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry[1]
+            del self._memory[key]
+        async with ReadSessionLocal() as db:
+            row = await db.get(SummaryCacheEntry, key)
+        if row is not None and row.expires_at > now:
+            self._remember(key, row.expires_at, row.summary)
+            self.persistent_hits += 1
+            return row.summary
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, model: str, summary: str):
+        now = time.time()
+        expires_at = now + self.settings.ttl_seconds
+        self._remember(key, expires_at, summary)
+        async with SessionLocal() as db:
+            await db.merge(SummaryCacheEntry(key=key, model=model, summary=summary, created_at=now, expires_at=expires_at))
+            await db.flush()
+            # 만료된 항목과 max_rows를 넘는 오래된 항목을 함께 정리합니다.
+            overflow = select(SummaryCacheEntry.key).order_by(SummaryCacheEntry.created_at.desc()).offset(self.settings.max_rows)
+            await db.execute(
+                delete(SummaryCacheEntry).where(
+                    (SummaryCacheEntry.expires_at <= now) | SummaryCacheEntry.key.in_(overflow)
+                )
+            )
+            await db.commit()
+
+    def stats(self) -> SummaryCacheStats:
+        return SummaryCacheStats(
+            memory_hits=self.memory_hits,
+            persistent_hits=self.persistent_hits,
+            misses=self.misses,
+            memory_entries=len(self._memory),
+        )
+
+summary_cache = SummaryCache(summary_cache_settings)
+
+# LLM 공급자 초기화 (CLASSMANAGER_LLM_PROVIDER=simulator 이면 오프라인 시뮬레이터 사용)
+llm_provider = create_llm_provider(llm_settings)
+
+llm_gateway = LLMGateway(llm_provider, llm_settings.max_concurrency, llm_settings.timeout_seconds) if llm_provider else None
+
+def get_llm_gateway() -> LLMGateway:
+    if llm_gateway is None:
+        raise HTTPException(status_code=500, detail="Gemini API client not initialized. Check your API key.")
+    return llm_gateway
+
+# ====================================================================
+# LLM 작업 (요약, 할 일 추출) — 엔드포인트와 작업 큐가 함께 사용
+# ====================================================================
+async def summarize_consultation_list(consultations: List[Consultation]) -> str:
+    if not consultations:
+        return "상담 기록이 없습니다."
+
+    # 같은 상담 기록에 대한 요약은 Gemini를 다시 호출하지 않고 캐시에서 돌려줍니다.
+    cache_key = SummaryCache.make_key(consultations, llm_settings.model)
+    cached_summary = await summary_cache.get(cache_key)
+    if cached_summary is not None:
+        return cached_summary
+
+    response_text = await get_llm_gateway().generate(
+        build_summary_prompt(consultations),
+        model=llm_settings.model,
+        config=types.GenerateContentConfig(
+            thinking_config=types.ThinkingConfig(thinking_budget=0)
+        )
+    )
+    summary_text = response_text.replace('*', '').strip()
+    await summary_cache.put(cache_key, llm_settings.model, summary_text)
+    return summary_text
+
+def build_class_summary_prompt(batch: List[tuple]) -> str:
+    student_text = ""
+    for student_id, consultations in batch:
+        student_text += f"[학생 {student_id}]\n"
+        for c in consultations:
+            student_text += f"날짜: {c.date}\n내용: {c.content}\n---\n"
+    return f"""
+        다음은 여러 학생의 상담 기록이야. 학생마다 기록 전체에서 가장 중요한 핵심 내용과 주요 변화를 3~4줄로 간결하게 요약해줘.
+        학생 번호를 키로, 요약을 값으로 하는 JSON 객체로만 답변해줘. 예: {{"12": "요약", "15": "요약"}}
+        
+        상담 기록:
+        "{student_text}"
+        """
+
+def pack_summary_batches(students: List[tuple], max_chars: int, max_students: int) -> List[List[tuple]]:
+    # 상담 기록 길이를 기준으로 프롬프트 예산 안에 들어가는 만큼 학생을 묶습니다.
+    batches, current, current_chars = [], [], 0
+    for student_id, consultations in students:
+        size = sum(len(c.date) + len(c.content) for c in consultations)
+        if current and (current_chars + size > max_chars or len(current) >= max_students):
+            batches.append(current)
+            current, current_chars = [], 0
+        current.append((student_id, consultations))
+        current_chars += size
+    if current:
+        batches.append(current)
+    return batches
+
+async def summarize_consultation_batch(batch: List[tuple]) -> Dict[int, str]:
+    if len(batch) == 1:
+        student_id, consultations = batch[0]
+        return {student_id: await summarize_consultation_list(consultations)}
+
+    response_text = await get_llm_gateway().generate(
+        build_class_summary_prompt(batch),
+        model=llm_settings.model,
+        config=types.GenerateContentConfig(
+            response_mime_type="application/json",
+            thinking_config=types.ThinkingConfig(thinking_budget=0)
+        )
+    )
+    try:
+        summaries = json.loads(response_text)
+    except ValueError:
+        summaries = {}
+    if not isinstance(summaries, dict):
+        summaries = {}
+
+    results = {}
+    for student_id, consultations in batch:
+        summary = summaries.get(str(student_id))
+        if not isinstance(summary, str) or not summary.strip():
+            # 응답에서 빠진 학생은 개별 호출로 다시 요약합니다.
+            results[student_id] = await summarize_consultation_list(consultations)
+            continue
+        summary_text = summary.replace('*', '').strip()
+        await summary_cache.put(SummaryCache.make_key(consultations, llm_settings.model), llm_settings.model, summary_text)
+        results[student_id] = summary_text
+    return results
+
+async def extract_todos_from_log(db: AsyncSession, log: WorkLogCreate, reprocess: bool = False):
+    # 같은 날짜의 일지에서 이미 처리한 문단은 빼고 새로 쓰거나 고친 문단만 LLM에 보내고,
+    # 그 일지에서 이미 추출한 할 일과 겹치는 항목은 다시 만들지 않습니다. 새로 만든 할 일만 돌려줍니다.
+    # reprocess=True이면 모든 문단을 다시 보냅니다 (중복 제거는 그대로 적용).
+    segments = split_log_segments(log.content)
+    # LLM 응답을 기다리는 동안 쓰기 연결을 잡고 있지 않도록 처리 기록은 읽기 세션으로 확인합니다.
+    async with ReadSessionLocal() as read_db:
+        processed = set() if reprocess else await get_processed_segment_hashes(read_db, log.date)
+    pending = [(content_hash, paragraph) for content_hash, paragraph in segments if content_hash not in processed]
+    if not pending:
+        return []
+    pending_text = "\n\n".join(paragraph for _, paragraph in pending)
+    response_text = await get_llm_gateway().generate(
+        f"""
+        다음은 교사의 하루 업무일지 내용이야. 이 내용에서 주요한 할 일들을 명확한 행동 동사로 시작하는 짧고 간결한 목록으로 추출해줘.
+        각 항목을 쉼표로 구분해. 만약 할 일이 없다면 '없음'이라고만 답변해줘.
+        
+        업무일지 내용:
+        "{pending_text}"
+        
+        예시:
+        - 학생 A 상담 진행, - 학부모 B 전화하기, - 수업 준비하기
+        """
+    )
+    extracted_text = response_text.replace('*', '').strip()
+    todo_list = [] if extracted_text == '없음' else [item.strip() for item in extracted_text.split(',') if item.strip()]
+
+    existing = await get_extracted_todo_keys(db, log.date)
+    new_items = []
+    for content in todo_list:
+        key = normalize_todo_content(content)
+        if key and key not in existing:
+            existing.add(key)
+            new_items.append(ToDoItemCreate(content=content))
+    await mark_segments_processed(db, log.date, [content_hash for content_hash, _ in pending])
+    if not new_items:
+        await db.commit()
+        return []
+    return await create_todo_items(db, new_items, source_date=log.date)
+
+# ====================================================================
+# LLM 작업 큐 (SQLite에 저장되어 재시작 후에도 이어서 처리)
+# ====================================================================
+class LLMJobQueue:
+    def __init__(self, settings: JobSettings):
+        self.settings = settings
+        self.handlers: Dict[str, Any] = {}
+        self._wakeup = asyncio.Event()
+        self._finished: Dict[str, asyncio.Event] = {}
+        self._workers: List[asyncio.Task] = []
+
+    def handler(self, kind: str):
+        def register(func):
+            self.handlers[kind] = func
+            return func
+        return register
+
+    async def submit(self, kind: str, payload: Dict[str, Any]) -> LLMJob:
+        now = time.time()
+        job = LLMJob(
+            id=uuid.uuid4().hex,
+            kind=kind,
+            payload=json.dumps(payload, ensure_ascii=False),
+            status="queued",
+            attempts=0,
+            created_at=now,
+            available_at=now,
+        )
+        async with SessionLocal() as db:
+            await self._prune(db, now)
+            db.add(job)
+            await db.commit()
+        self._wakeup.set()
+        return job
+
+    async def _prune(self, db: AsyncSession, now: float):
+        # 끝난 작업에는 상담 기록 같은 요청 본문이 남아 있으므로 보관 기간이 지나면 지웁니다.
+        await db.execute(delete(LLMJob).where(LLMJob.finished_at < now - self.settings.retention_seconds))
+
+    async def get(self, job_id: str) -> Optional[LLMJob]:
+        async with ReadSessionLocal() as db:
+            return await db.get(LLMJob, job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[LLMJob]:
+        # 완료 이벤트를 먼저 등록한 뒤 상태를 읽어야 그 사이에 끝난 작업을 놓치지 않습니다.
+        finished = self._finished.setdefault(job_id, asyncio.Event())
+        job = await self.get(job_id)
+        if job is not None and job.status not in ("done", "failed") and timeout > 0:
+            try:
+                await asyncio.wait_for(finished.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            job = await self.get(job_id)
+        if finished.is_set() or job is None or job.status in ("done", "failed"):
+            self._finished.pop(job_id, None)
+        return job
+
+    async def _next_available_at(self) -> Optional[float]:
+        # 읽기 풀에서 대기 중인 작업의 가장 이른 실행 시각만 확인합니다 (상태+시각 인덱스).
+        # 큐가 비어 있을 때 유휴 워커가 하나뿐인 쓰기 연결을 차지하지 않도록 합니다.
+        async with ReadSessionLocal() as db:
+            return await db.scalar(select(func.min(LLMJob.available_at)).where(LLMJob.status == "queued"))
+
+    async def _claim(self) -> Optional[LLMJob]:
+        now = time.time()
+        next_job_id = (
+            select(LLMJob.id)
+            .where(LLMJob.status == "queued", LLMJob.available_at <= now)
+            .order_by(LLMJob.available_at)
+            .limit(1)
+            .scalar_subquery()
+        )
+        # 쓰기 연결이 하나뿐이라 UPDATE ... RETURNING 한 번으로 작업을 원자적으로 가져옵니다.
+        async with SessionLocal() as db:
+            job = await db.scalar(
+                update(LLMJob)
+                .where(LLMJob.id == next_job_id)
+                .values(status="running", started_at=now, attempts=LLMJob.attempts + 1)
+                .returning(LLMJob)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        return job
+
+    async def _run(self, job: LLMJob):
+        try:
+            result = await self.handlers[job.kind](json.loads(job.payload))
+            values = dict(status="done", result=json.dumps(result, ensure_ascii=False), error=None, finished_at=time.time())
+        except Exception as e:
+            error = e.detail if isinstance(e, HTTPException) else (str(e) or type(e).__name__)
+            if job.attempts < self.settings.max_attempts:
+                retry_delay = self.settings.retry_backoff_seconds * 2 ** (job.attempts - 1)
+                values = dict(status="queued", error=error, available_at=time.time() + retry_delay)
+            else:
+                logger.warning("LLM 작업 실패 (%s, %s): %s", job.kind, job.id, error)
+                values = dict(status="failed", error=error, finished_at=time.time())
+        async with SessionLocal() as db:
+            await db.execute(update(LLMJob).where(LLMJob.id == job.id).values(**values))
+            await db.commit()
+        if values["status"] != "queued":
+            finished = self._finished.pop(job.id, None)
+            if finished is not None:
+                finished.set()
+
+    async def _worker(self):
+        while True:
+            self._wakeup.clear()
+            job = None
+            timeout = self.settings.poll_interval_seconds
+            try:
+                available_at = await self._next_available_at()
+                if available_at is not None:
+                    delay = available_at - time.time()
+                    if delay <= 0:
+                        job = await self._claim()
+                    else:
+                        # 재시도 대기 중인 작업은 실행 가능해지는 시각에 맞춰 깨어납니다.
+                        timeout = min(timeout, delay)
+            except Exception:
+                logger.exception("LLM 작업 가져오기 오류")
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    async def start(self):
+        # 이전 프로세스가 처리하다 멈춘 작업은 다시 대기열로 돌립니다.
+        async with SessionLocal() as db:
+            await db.execute(update(LLMJob).where(LLMJob.status == "running").values(status="queued"))
+            await self._prune(db, time.time())
+            await db.commit()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.settings.workers)]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def stats(self) -> JobQueueStats:
+        now = time.time()
+        async with ReadSessionLocal() as db:
+            counts = dict((await db.execute(select(LLMJob.status, func.count()).group_by(LLMJob.status))).all())
+            oldest_queued = await db.scalar(select(func.min(LLMJob.created_at)).where(LLMJob.status == "queued"))
+            recent_waits = (
+                select((LLMJob.started_at - LLMJob.created_at).label("wait"))
+                .where(LLMJob.started_at.isnot(None))
+                .order_by(LLMJob.started_at.desc())
+                .limit(100)
+                .subquery()
+            )
+            avg_wait = await db.scalar(select(func.avg(recent_waits.c.wait)))
+        return JobQueueStats(
+            queued=counts.get("queued", 0),
+            running=counts.get("running", 0),
+            done=counts.get("done", 0),
+            failed=counts.get("failed", 0),
+            oldest_queued_age_seconds=now - oldest_queued if oldest_queued is not None else None,
+            avg_wait_seconds=avg_wait,
+        )
+
+job_queue = LLMJobQueue(job_settings)
+
+@job_queue.handler("summarize_consultations")
+async def run_summarize_consultations_job(payload: Dict[str, Any]):
+    consultations = ConsultationList.model_validate(payload)
+    return {"summary": await summarize_consultation_list(consultations.consultations)}
+
+@job_queue.handler("extract_todos")
+async def run_extract_todos_job(payload: Dict[str, Any]):
+    async with SessionLocal() as db:
+        created_todos = await extract_todos_from_log(db, WorkLogCreate.model_validate(payload), reprocess=payload.get("reprocess", False))
+        return [ToDoItemSchema.model_validate(todo).model_dump(mode="json") for todo in created_todos]
+
 # ====================================================================
 # FastAPI 앱 및 엔드포인트
 # ====================================================================
-app = FastAPI(title="교사업무도우미 API")
+def _add_missing_columns(connection):
+    # create_all은 이미 있는 테이블에 새 컬럼을 추가하지 않으므로 (change_seq, source_date 등) 직접 추가합니다.
+    # 기존 행이 있어도 추가할 수 있도록 NULL을 허용하는 컬럼만 대상입니다.
+    inspector = inspect(connection)
+    for model in ChangeTracker.TABLES.values():
+        existing = {column["name"] for column in inspector.get_columns(model.__tablename__)}
+        for column in model.__table__.columns:
+            if column.name not in existing and column.nullable:
+                column_type = column.type.compile(dialect=connection.dialect)
+                connection.exec_driver_sql(f"ALTER TABLE {model.__tablename__} ADD COLUMN {column.name} {column_type}")
+
+def _create_missing_indexes(connection):
+    # create_all은 이미 있는 테이블에 새 인덱스를 추가하지 않으므로 따로 확인합니다.
+    for model in (*ChangeTracker.TABLES.values(), LLMJob):
+        for index in model.__table__.indexes:
+            index.create(bind=connection, checkfirst=True)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    database_lock.acquire()
+    query_profiler.start()
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.run_sync(_add_missing_columns)
+        await connection.run_sync(_create_missing_indexes)
+        await connection.run_sync(_create_search_tables)
+    async with SessionLocal() as migration_db:
+        await table_versions.load(migration_db)
+        await change_tracker.load(migration_db)
+        await migrate_legacy_consultations(migration_db)
+        await fail_interrupted_student_imports(migration_db)
+        await sync_search_index(migration_db)
+    async with ReadSessionLocal() as index_db:
+        await student_name_index.rebuild(index_db)
+    await job_queue.start()
+    yield
+    change_hub.close()
+    await job_queue.stop()
+    await engine.dispose()
+    await read_engine.dispose()
+    query_profiler.stop()
+    database_lock.release()
+
+class MetricsMiddleware:
+    # 순수 ASGI 미들웨어: 응답 본문을 감싸지 않고 상태 코드만 가로채므로 스트리밍 응답에도 부담이 없습니다.
+    # 라우트 템플릿(/students/{student_id})은 라우팅이 끝난 뒤 scope["route"]에서 읽습니다.
+    # Starlette는 BackgroundTasks를 self.app(...) 안에서 응답 전송 후에 실행하므로,
+    # 마지막 응답 본문(more_body=False)을 보낸 시점에 측정을 끝냅니다.
+    def __init__(self, app):
+        self.app = app
 
-# Gemini API 클라이언트 초기화
-try:
-    client = genai.Client()
-except Exception as e:
-    print(f"Failed to initialize Gemini client: {e}")
-    client = None
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        status_code = 500
+        stats = RequestStats(profile=query_profiler.enabled)
+        add_headers = query_profiler.enabled and query_profiler.settings.response_headers
+        token = current_request_stats.set(stats)
+        started = time.perf_counter()
+
+        def finish():
+            if stats.finished:
+                return
+            stats.finished = True
+            elapsed = time.perf_counter() - started
+            http_requests_in_flight.add(-1, method)
+            route = self._route(scope)
+            http_requests_total.inc(method, route, status_code)
+            http_request_seconds.observe(elapsed, method, route)
+            http_request_db_queries.observe(stats.queries, method, route)
+            http_request_db_seconds.observe(stats.query_seconds, method, route)
+            if stats.statements is not None:
+                query_profiler.finish(stats, method, scope["path"], route, status_code, elapsed)
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if add_headers:
+                    message["headers"] = list(message.get("headers", [])) + query_profiler.response_headers(stats)
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finish()
+
+        http_requests_in_flight.add(1, method)
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception:
+            if not stats.finished:
+                http_exceptions_total.inc(method, self._route(scope))
+            raise
+        finally:
+            # 응답을 끝까지 보내지 못한 경우 (예외, 연결 끊김)
+            finish()
+            current_request_stats.reset(token)
+
+    @staticmethod
+    def _route(scope) -> str:
+        # 일치하는 라우트가 없는 경로(404)는 라벨 수가 늘지 않도록 하나로 묶습니다.
+        route = scope.get("route")
+        return getattr(route, "path", None) or "unmatched"
+
+app = FastAPI(title="교사업무도우미 API", lifespan=lifespan)
 
 # CORS 설정
 origins = ["*"]
@@ -248,182 +2437,437 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Query-Count", "Server-Timing"],
 )
+app.add_middleware(MetricsMiddleware)
 
-Base.metadata.create_all(bind=engine)
+metrics.gauge("sse_subscribers", "Open /events connections.", collect=lambda: {(): change_hub.stats()["subscribers"]})
 
-@app.get("/students/", response_model=List[StudentSchema])
-def read_students_endpoint(db: Session = Depends(get_db)):
-    students = get_students(db)
-    for student in students:
-        student.consultations = json.loads(student.consultations) if student.consultations else []
-    return students
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/debug/queries", include_in_schema=False)
+async def debug_queries_endpoint(n_plus_one: bool = False, limit: int = Query(20, ge=1, le=500)):
+    # 프로파일러가 켜져 있을 때만 최근 요청별 SQL 기록을 보여 줍니다 (최신 요청 먼저).
+    if not query_profiler.enabled:
+        raise HTTPException(status_code=404, detail="SQL 프로파일러가 꺼져 있습니다. (CLASSMANAGER_PROFILER_ENABLED)")
+    profiles = [profile for profile in reversed(query_profiler.recent) if profile["repeated"] or not n_plus_one]
+    return profiles[:limit]
+
+# view=full은 StudentSchema 목록, view=summary는 StudentSummary 목록을 돌려줍니다 (OpenAPI에 두 모양을 모두 표시).
+@app.get("/students/", response_model=Union[List[StudentSchema], List[StudentSummary]])
+async def read_students_endpoint(
+    grade: Optional[int] = None,
+    class_num: Optional[int] = None,
+    name: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    view: str = Query("full", pattern="^(summary|full)$"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db),
+):
+    # limit을 주면 (학년, 반, 번호) 순으로 잘라서 반환하고, 다음 페이지 커서는 X-Next-Cursor 헤더로 알려줍니다.
+    etag, not_modified = conditional_response("students", if_none_match)
+    if not_modified is not None:
+        return not_modified
+    try:
+        after = decode_roster_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    filters = dict(grade=grade, class_num=class_num, name_prefix=name, after=after, limit=limit)
+    if view == "summary":
+        # view=summary는 StudentSummary 모양의 행을 그대로 직렬화해 StudentSchema 검증을 건너뜁니다.
+        rows = await get_student_summaries(db, **filters)
+        summary_response = JSONResponse(content=[dict(row._mapping) for row in rows])
+        set_etag_headers(summary_response, etag)
+        if limit is not None and len(rows) == limit:
+            summary_response.headers["X-Next-Cursor"] = encode_roster_cursor(rows[-1])
+        return summary_response
+    rows = await get_students_json(db, **filters)
+    full_response = Response(content="[" + ",".join(row.student_json for row in rows) + "]", media_type="application/json")
+    set_etag_headers(full_response, etag)
+    if limit is not None and len(rows) == limit:
+        full_response.headers["X-Next-Cursor"] = encode_roster_cursor(rows[-1])
+    return full_response
+
+@app.get("/students/typeahead", response_model=List[StudentSummary])
+async def student_typeahead_endpoint(q: str = Query(..., min_length=1), limit: int = Query(10, ge=1, le=50)):
+    # 메모리 색인만 조회하므로 데이터베이스에 접근하지 않습니다. "ㄱㅁㅅ", "김ㅁ", "민수" 모두 지원합니다.
+    return JSONResponse(content=student_name_index.search(q, limit))
 
 @app.post("/students/", response_model=StudentSchema, status_code=status.HTTP_201_CREATED)
-def create_student_endpoint(student: StudentCreate, db: Session = Depends(get_db)):
-    new_student = create_student(db, student)
-    new_student.consultations = json.loads(new_student.consultations)
-    return new_student
+async def create_student_endpoint(student: StudentCreate, db: AsyncSession = Depends(get_db)):
+    return await create_student(db, student)
+
+@app.post("/students/bulk", response_model=StudentBulkResult, status_code=status.HTTP_201_CREATED)
+async def create_students_bulk_endpoint(rows: List[Dict[str, Any]], db: AsyncSession = Depends(get_db)):
+    # 행 단위로 검증하여 잘못된 행만 오류로 보고하고 나머지는 그대로 저장합니다.
+    valid_students = []
+    errors = []
+    for index, row in enumerate(rows):
+        try:
+            valid_students.append(StudentCreate.model_validate(row))
+        except ValidationError as e:
+            errors.append(BulkRowError(index=index, errors=e.errors(include_url=False, include_context=False)))
+    return {"created": await create_students_bulk(db, valid_students), "errors": errors}
+
+@app.post("/students/import", response_model=StudentImportStatus, status_code=status.HTTP_202_ACCEPTED)
+async def import_students_endpoint(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db),
+):
+    filename = file.filename or ""
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if extension not in ("csv", "tsv", "xlsx"):
+        raise HTTPException(status_code=400, detail="Only CSV, TSV and XLSX files are supported")
+    # 업로드 본문은 조각 단위로 임시 파일에 옮겨 두고, 파싱은 응답 이후 백그라운드에서 진행합니다.
+    path = await run_in_threadpool(_spool_upload, file.file, extension)
+    job = await create_student_import(db, filename)
+    background_tasks.add_task(run_student_import, job, path, extension)
+    return job
+
+@app.get("/students/import/{job_id}", response_model=StudentImportStatus)
+async def read_student_import_endpoint(job_id: str, db: AsyncSession = Depends(get_read_db)):
+    job = await get_student_import(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
 
 @app.delete("/students/", status_code=status.HTTP_204_NO_CONTENT)
-def delete_all_students_endpoint(db: Session = Depends(get_db)):
-    delete_all_students(db)
+async def delete_all_students_endpoint(db: AsyncSession = Depends(get_db)):
+    await delete_all_students(db)
 
 @app.get("/students/{student_id}", response_model=StudentSchema)
-def read_student_endpoint(student_id: int, db: Session = Depends(get_db)):
-    student = get_student_by_id(db, student_id)
-    if student is None:
+async def read_student_endpoint(student_id: int, db: AsyncSession = Depends(get_read_db)):
+    student_json = await get_student_json(db, student_id)
+    if student_json is None:
         raise HTTPException(status_code=404, detail="Student not found")
-    student.consultations = json.loads(student.consultations) if student.consultations else []
-    return student
+    return Response(content=student_json, media_type="application/json")
 
 @app.put("/students/{student_id}", response_model=StudentSchema)
-def update_student_endpoint(student_id: int, student: StudentUpdate, db: Session = Depends(get_db)):
-    updated_student = update_student(db, student_id, student)
+async def update_student_endpoint(student_id: int, student: StudentUpdate, db: AsyncSession = Depends(get_db)):
+    updated_student = await update_student(db, student_id, student)
     if updated_student is None:
         raise HTTPException(status_code=404, detail="Student not found")
-    updated_student.consultations = json.loads(updated_student.consultations)
     return updated_student
 
 @app.delete("/students/{student_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_student_endpoint(student_id: int, db: Session = Depends(get_db)):
-    if not delete_student(db, student_id):
+async def delete_student_endpoint(student_id: int, db: AsyncSession = Depends(get_db)):
+    if not await delete_student(db, student_id):
         raise HTTPException(status_code=404, detail="Student not found")
 
 @app.post("/students/{student_id}/consultations", response_model=StudentSchema)
-def add_consultation_endpoint(student_id: int, consultation: Consultation, db: Session = Depends(get_db)):
-    updated_student = add_consultation(db, student_id, consultation)
+async def add_consultation_endpoint(student_id: int, consultation: Consultation, db: AsyncSession = Depends(get_db)):
+    updated_student = await add_consultation(db, student_id, consultation)
     if updated_student is None:
         raise HTTPException(status_code=404, detail="Student not found")
-    updated_student.consultations = json.loads(updated_student.consultations)
     return updated_student
 
+@app.get("/students/{student_id}/consultations", response_model=List[ConsultationSchema])
+async def read_consultations_endpoint(
+    student_id: int,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_read_db),
+):
+    if not await student_exists(db, student_id):
+        raise HTTPException(status_code=404, detail="Student not found")
+    return await get_consultations(db, student_id, skip=skip, limit=limit)
+
 @app.post("/students/{student_id}/summarize-consultations")
-def summarize_consultations_endpoint(student_id: int, consultations: ConsultationList):
-    if not client:
-        raise HTTPException(status_code=500, detail="Gemini API client not initialized. Check your API key.")
+async def summarize_consultations_endpoint(student_id: int, consultations: ConsultationList):
     try:
-        consultation_text = ""
-        if not consultations.consultations:
-            return {"summary": "상담 기록이 없습니다."}
-
-        for c in consultations.consultations:
-            consultation_text += f"날짜: {c.date}\n내용: {c.content}\n---\n"
-        
-        prompt = f"""
-        다음은 학생의 상담 기록이야. 이 기록 전체에서 가장 중요한 핵심 내용과 주요 변화를 3~4줄로 간결하게 요약해줘.
-        
-        상담 기록:
-        "{consultation_text}"
-        """
-        response = client.models.generate_content(
-            model="gemini-1.5-flash-latest",
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                thinking_config=types.ThinkingConfig(thinking_budget=0)
-            )
-        )
-        
-        summary_text = response.text.replace('*', '').strip()
-        return {"summary": summary_text}
-    except Exception as e:
-        print(f"Gemini API 호출 오류: {e}")
+        return {"summary": await summarize_consultation_list(consultations.consultations)}
+    except HTTPException:
+        raise
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Gemini API 응답 시간이 초과되었습니다.")
+    except Exception:
+        logger.exception("Gemini API 호출 오류")
         raise HTTPException(status_code=500, detail="Gemini API 호출 중 오류가 발생했습니다.")
 
+@app.post("/classes/{grade}/{class_num}/summaries")
+async def summarize_class_endpoint(grade: int, class_num: int):
+    # 학생별 결과를 끝나는 순서대로 한 줄씩(JSON Lines) 내려보냅니다.
+    # 요약 캐시도 읽기 연결을 쓰므로, 명단을 읽은 세션은 캐시 조회 전에 닫아야 읽기 풀이 고갈되지 않습니다.
+    async with ReadSessionLocal() as db:
+        students = await get_students(db, grade=grade, class_num=class_num)
+    students_by_id = {student.id: student for student in students}
+
+    cached_lines = []
+    pending = []
+    for student in students:
+        if not student.consultations:
+            continue
+        consultations = [Consultation.model_validate(c) for c in student.consultations]
+        cached_summary = await summary_cache.get(SummaryCache.make_key(consultations, llm_settings.model))
+        if cached_summary is not None:
+            cached_lines.append({"student_id": student.id, "name": student.name, "summary": cached_summary})
+        else:
+            pending.append((student.id, consultations))
+    if pending:
+        get_llm_gateway()
+
+    batches = pack_summary_batches(pending, llm_settings.batch_prompt_chars, llm_settings.batch_max_students)
+
+    async def run_batch(batch):
+        try:
+            return batch, await summarize_consultation_batch(batch), None
+        except asyncio.TimeoutError:
+            return batch, {}, "Gemini API 응답 시간이 초과되었습니다."
+        except Exception:
+            logger.exception("Gemini API 호출 오류")
+            return batch, {}, "Gemini API 호출 중 오류가 발생했습니다."
+
+    async def stream_summaries():
+        for line in cached_lines:
+            yield json.dumps(line, ensure_ascii=False) + "\n"
+        # 동시 호출 수는 LLM 게이트웨이의 세마포어가 제한합니다.
+        tasks = [asyncio.create_task(run_batch(batch)) for batch in batches]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                batch, summaries, error = await next_done
+                for student_id, _ in batch:
+                    line = {"student_id": student_id, "name": students_by_id[student_id].name}
+                    if student_id in summaries:
+                        line["summary"] = summaries[student_id]
+                    else:
+                        line["error"] = error
+                    yield json.dumps(line, ensure_ascii=False) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream_summaries(), media_type="application/x-ndjson")
+
+@app.post("/students/{student_id}/summarize-consultations/jobs", response_model=JobSchema, status_code=status.HTTP_202_ACCEPTED)
+async def submit_summarize_consultations_job_endpoint(student_id: int, consultations: ConsultationList):
+    payload = consultations.model_dump(mode="json")
+    payload["student_id"] = student_id
+    return await job_queue.submit("summarize_consultations", payload)
+
+@app.get("/events")
+async def change_events_endpoint(entity: Optional[List[Literal["students", "work_logs", "todos"]]] = Query(None)):
+    # 커밋된 변경을 SSE로 알립니다: event: change, data: {"entity", "id", "op": create|update|delete|delete_all, "seq"}
+    # 접속하면 hello 이벤트로 현재 seq를 보내고, 너무 느려 끊길 때는 resync 이벤트를 보냅니다.
+    # 클라이언트는 재접속 후 /sync?since=<마지막 seq> 로 놓친 변경을 받으면 됩니다.
+    if change_hub.is_full():
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Too many event subscribers")
+    return StreamingResponse(
+        change_hub.stream(set(entity) if entity else None),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/events/stats")
+async def change_events_stats_endpoint():
+    return change_hub.stats()
+
+@app.get("/jobs/stats", response_model=JobQueueStats)
+async def read_job_queue_stats_endpoint():
+    return await job_queue.stats()
+
+@app.get("/jobs/{job_id}", response_model=JobSchema)
+async def read_job_endpoint(job_id: str, wait: float = Query(0, ge=0, le=60)):
+    # wait(초)를 주면 작업이 끝나거나 시간이 다 될 때까지 응답을 미룹니다 (롱 폴링).
+    job = await job_queue.wait(job_id, timeout=wait)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/cache/summaries/stats", response_model=SummaryCacheStats)
+async def read_summary_cache_stats_endpoint():
+    return summary_cache.stats()
+
+@app.get("/search", response_model=List[SearchHit])
+async def search_endpoint(
+    q: str = Query(..., min_length=1),
+    kind: Optional[Literal["consultation", "work_log"]] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+):
+    kinds = [kind] if kind else list(SEARCH_TABLES)
+    return await search_records(db, q, kinds, date_from=date_from, date_to=date_to, limit=limit)
+
+def _sync_section(upserts: List[str], deletes: List[int]) -> str:
+    return '{"upserts":[' + ",".join(upserts) + '],"deletes":' + json.dumps(deletes) + "}"
+
+def _sync_response(seq: int, full: bool, students: List[str], work_logs: List[str], todos: List[str], deletes: Dict[str, List[int]]) -> Response:
+    body = (
+        f'{{"seq":{seq},"full":{"true" if full else "false"},'
+        f'"students":{_sync_section(students, deletes.get("students", []))},'
+        f'"work_logs":{_sync_section(work_logs, deletes.get("work_logs", []))},'
+        f'"todos":{_sync_section(todos, deletes.get("todos", []))}}}'
+    )
+    return Response(content=body, media_type="application/json", headers={"Cache-Control": "no-store"})
+
+@app.get("/sync")
+async def sync_endpoint(since: Optional[int] = Query(None, ge=0), db: AsyncSession = Depends(get_read_db)):
+    # 응답의 seq를 다음 요청의 since로 보내면 그 사이에 추가/수정된 행과 삭제된 id만 받습니다.
+    # full이 true이면 since가 없거나 너무 오래된 것이므로 클라이언트는 가지고 있던 목록을 통째로 교체해야 합니다.
+    if since is not None and since == table_versions.version("changes"):
+        return _sync_response(since, False, [], [], [], {})
+
+    # 변경 번호를 행보다 먼저 읽어야, 그 사이에 커밋된 변경이 다음 동기화에서 빠지지 않습니다 (중복 전달은 무해).
+    seq = await db.scalar(select(TableVersion.version).where(TableVersion.name == "changes"))
+    floor = await db.scalar(select(TableVersion.version).where(TableVersion.name == "sync_floor"))
+    full = since is None or since < floor or since > seq
+    changed_since = None if full else since
+    students = await get_changed_students_json(db, changed_since)
+    work_logs = [WorkLogSchema.model_validate(row).model_dump_json() for row in await get_changed_rows(db, WorkLog, changed_since)]
+    todos = [ToDoItemSchema.model_validate(row).model_dump_json() for row in await get_changed_rows(db, ToDoItem, changed_since)]
+    deletes = {} if full else {name: await get_deleted_ids(db, name, since) for name in ChangeTracker.TABLES}
+    return _sync_response(seq, full, students, work_logs, todos, deletes)
+
 @app.get("/work-logs/", response_model=List[WorkLogSchema])
-def read_work_logs_endpoint(db: Session = Depends(get_db)):
-    return get_work_logs(db)
+async def read_work_logs_endpoint(
+    response: Response,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    cursor: Optional[date] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db),
+):
+    # from/to(포함)로 기간을 고르고, limit을 주면 날짜 순으로 잘라서 다음 페이지 커서(마지막 날짜)를 X-Next-Cursor 헤더로 알려줍니다.
+    # order=desc 이면 최근 일지부터 돌려줍니다.
+    etag, not_modified = conditional_response("work_logs", if_none_match)
+    if not_modified is not None:
+        return not_modified
+    set_etag_headers(response, etag)
+    logs = await get_work_logs(db, date_from=date_from, date_to=date_to, after=cursor, limit=limit, descending=order == "desc")
+    if limit is not None and len(logs) == limit:
+        response.headers["X-Next-Cursor"] = logs[-1].date.isoformat()
+    return logs
+
+@app.get("/work-logs/calendar/{year}/{month}", response_model=List[WorkLogCalendarDay])
+async def read_work_log_calendar_endpoint(
+    response: Response,
+    year: int = Path(..., ge=1, le=9998),
+    month: int = Path(..., ge=1, le=12),
+    preview: int = Query(40, ge=0, le=200),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db),
+):
+    # 한 달 동안 일지가 있는 날짜와 본문 앞부분(preview 글자)만 돌려줍니다.
+    etag, not_modified = conditional_response("work_logs", if_none_match)
+    if not_modified is not None:
+        return not_modified
+    set_etag_headers(response, etag)
+    return await get_work_log_calendar(db, year, month, preview)
 
 @app.get("/work-logs/{log_date}", response_model=WorkLogSchema)
-def read_work_log_by_date_endpoint(log_date: date, db: Session = Depends(get_db)):
-    db_log = get_work_log_by_date(db, log_date)
+async def read_work_log_by_date_endpoint(log_date: date, db: AsyncSession = Depends(get_read_db)):
+    db_log = await get_work_log_by_date(db, log_date)
     if db_log is None:
         raise HTTPException(status_code=404, detail="Work log not found for this date")
     return db_log
 
 @app.post("/work-logs/", response_model=WorkLogSchema)
-def create_or_update_work_log_endpoint(work_log: WorkLogCreate, db: Session = Depends(get_db)):
-    db_log = get_work_log_by_date(db, work_log.date)
-    if db_log:
-        updated_log = update_work_log(db, work_log.date, work_log.content)
-        return updated_log
-    else:
-        new_log = create_work_log(db, work_log)
-        return new_log
+async def create_or_update_work_log_endpoint(work_log: WorkLogCreate, db: AsyncSession = Depends(get_db)):
+    created, updated = await upsert_work_logs(db, [work_log])
+    return (created or updated)[0]
+
+@app.post("/work-logs/batch", response_model=WorkLogBatchResult)
+async def upsert_work_logs_batch_endpoint(rows: List[Dict[str, Any]] = Body(..., max_length=5000), db: AsyncSession = Depends(get_db)):
+    # 지난 기록을 한꺼번에 옮겨 올 때 사용: 날짜별로 새로 만들거나 덮어쓰고, 모두 한 트랜잭션으로 저장합니다.
+    # 검증에 실패한 행만 오류로 보고하고 나머지는 그대로 저장합니다.
+    valid_logs = []
+    errors = []
+    for index, row in enumerate(rows):
+        try:
+            valid_logs.append(WorkLogCreate.model_validate(row))
+        except ValidationError as e:
+            errors.append(BulkRowError(index=index, errors=e.errors(include_url=False, include_context=False)))
+    created, updated = await upsert_work_logs(db, valid_logs)
+    return {"created": len(created), "updated": len(updated), "errors": errors}
 
 @app.delete("/work-logs/{log_date}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_work_log_endpoint(log_date: date, db: Session = Depends(get_db)):
-    if not delete_work_log(db, log_date):
+async def delete_work_log_endpoint(log_date: date, db: AsyncSession = Depends(get_db)):
+    if not await delete_work_log(db, log_date):
         raise HTTPException(status_code=404, detail="Work log not found for this date")
 
 @app.get("/todos/", response_model=List[ToDoItemSchema])
-def read_todos_endpoint(db: Session = Depends(get_db)):
-    return get_todo_items(db)
+async def read_todos_endpoint(response: Response, if_none_match: Optional[str] = Header(None), db: AsyncSession = Depends(get_read_db)):
+    etag, not_modified = conditional_response("todos", if_none_match)
+    if not_modified is not None:
+        return not_modified
+    set_etag_headers(response, etag)
+    return await get_todo_items(db)
 
 @app.post("/todos/", response_model=ToDoItemSchema, status_code=status.HTTP_201_CREATED)
-def create_todo_endpoint(todo: ToDoItemCreate, db: Session = Depends(get_db)):
-    return create_todo_item(db, item=todo)
+async def create_todo_endpoint(todo: ToDoItemCreate, db: AsyncSession = Depends(get_db)):
+    return await create_todo_item(db, item=todo)
+
+@app.post("/todos/bulk", response_model=List[ToDoItemSchema], status_code=status.HTTP_201_CREATED)
+async def create_todos_bulk_endpoint(todos: List[ToDoItemCreate] = Body(..., max_length=1000), db: AsyncSession = Depends(get_db)):
+    return await create_todo_items(db, todos)
+
+def _check_todo_selection(selection: ToDoBulkSelection):
+    if (selection.ids is None) == (selection.status is None):
+        raise HTTPException(status_code=400, detail="Specify either ids or status")
+
+@app.post("/todos/bulk/update", response_model=ToDoBulkResult)
+async def update_todos_bulk_endpoint(selection: ToDoBulkUpdate, db: AsyncSession = Depends(get_db)):
+    # 예: {"status": "active", "is_completed": true} 는 남은 할 일을 모두 완료로 표시합니다.
+    _check_todo_selection(selection)
+    return {"ids": await set_todo_items_completed(db, selection.is_completed, ids=selection.ids, status_filter=selection.status)}
+
+@app.post("/todos/bulk/delete", response_model=ToDoBulkResult)
+async def delete_todos_bulk_endpoint(selection: ToDoBulkSelection, db: AsyncSession = Depends(get_db)):
+    # 예: {"status": "completed"} 는 완료된 할 일을 모두 지웁니다.
+    _check_todo_selection(selection)
+    return {"ids": await delete_todo_items(db, ids=selection.ids, status_filter=selection.status)}
 
 @app.put("/todos/{todo_id}", response_model=ToDoItemSchema)
-def update_todo_endpoint(todo_id: int, todo: ToDoItemUpdate, db: Session = Depends(get_db)):
-    updated_item = update_todo_item(db, todo_id, item=todo)
+async def update_todo_endpoint(todo_id: int, todo: ToDoItemUpdate, db: AsyncSession = Depends(get_db)):
+    updated_item = await update_todo_item(db, todo_id, item=todo)
     if not updated_item:
         raise HTTPException(status_code=404, detail="Todo item not found")
     return updated_item
 
 @app.delete("/todos/{todo_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_todo_endpoint(todo_id: int, db: Session = Depends(get_db)):
-    if not delete_todo_item(db, todo_id):
+async def delete_todo_endpoint(todo_id: int, db: AsyncSession = Depends(get_db)):
+    if not await delete_todo_item(db, todo_id):
         raise HTTPException(status_code=404, detail="Todo item not found")
 
 @app.post("/todos/from-log/", response_model=List[ToDoItemSchema])
-def extract_todos_from_log_endpoint(log: WorkLogCreate, db: Session = Depends(get_db)):
-    if not client:
-        raise HTTPException(status_code=500, detail="Gemini API client not initialized. Check your API key.")
+async def extract_todos_from_log_endpoint(log: WorkLogCreate, reprocess: bool = False, db: AsyncSession = Depends(get_db)):
+    # 이미 처리한 문단은 다시 보내지 않으므로, 바뀐 내용이 없으면 LLM 호출 없이 빈 목록을 돌려줍니다.
     try:
-        response = client.models.generate_content(
-            model="gemini-1.5-flash-latest",
-            contents=f"""
-            다음은 교사의 하루 업무일지 내용이야. 이 내용에서 주요한 할 일들을 명확한 행동 동사로 시작하는 짧고 간결한 목록으로 추출해줘.
-            각 항목을 쉼표로 구분해. 만약 할 일이 없다면 '없음'이라고만 답변해줘.
-            
-            업무일지 내용:
-            "{log.content}"
-            
-            예시:
-            - 학생 A 상담 진행, - 학부모 B 전화하기, - 수업 준비하기
-            """
-        )
-        extracted_text = response.text.replace('*', '').strip()
-        if extracted_text == '없음':
-            return []
-            
-        todo_list = [item.strip() for item in extracted_text.split(',') if item.strip()]
-        
-        created_todos = []
-        for content in todo_list:
-            todo_item = ToDoItemCreate(content=content)
-            created_item = create_todo_item(db, item=todo_item)
-            created_todos.append(created_item)
-        return created_todos
-    except Exception as e:
-        print(f"Gemini API 호출 오류: {e}")
+        return await extract_todos_from_log(db, log, reprocess=reprocess)
+    except HTTPException:
+        raise
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Gemini API 응답 시간이 초과되었습니다.")
+    except Exception:
+        logger.exception("Gemini API 호출 오류")
         raise HTTPException(status_code=500, detail="Gemini API 호출 중 오류가 발생했습니다.")
 
+@app.post("/todos/from-log/jobs", response_model=JobSchema, status_code=status.HTTP_202_ACCEPTED)
+async def submit_extract_todos_job_endpoint(log: WorkLogCreate, reprocess: bool = False):
+    return await job_queue.submit("extract_todos", dict(log.model_dump(mode="json"), reprocess=reprocess))
+
 @app.get("/test/gemini-status")
 async def get_gemini_status_endpoint():
     api_key = os.getenv("GOOGLE_API_KEY")
     if not api_key:
         raise HTTPException(status_code=500, detail="Google API Key not found in environment variables.")
 
+    gateway = get_llm_gateway()
     try:
-        response = client.models.generate_content(
+        response_text = await gateway.generate(
+            "Is the Gemini API working?",
             model="gemini-2.5-flash-latest",
-            contents="Is the Gemini API working?",
             config=types.GenerateContentConfig(
                 thinking_config=types.ThinkingConfig(thinking_budget=0)
             )
         )
-        return {"status": "success", "message": "Gemini API is working correctly!", "response": response.text}
+        return {"status": "success", "message": "Gemini API is working correctly!", "response": response_text}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to connect to Gemini API. Error: {e}")
\ No newline at end of file
@@ -0,0 +1,14 @@
+import apiClient from './axios';
+
+// 서버의 변경 알림(SSE)을 구독합니다. entities: ['students', 'work_logs', 'todos'] 중 필요한 것만 (비우면 전체)
+// onChange는 { entity, id, op, seq }를 받고, 연결이 밀려 알림을 놓쳤을 때는 { op: 'resync' }를 받습니다.
+// 반환된 함수를 호출하면 구독을 끝냅니다.
+export const subscribeChanges = (entities, onChange) => {
+  const url = new URL('/events', apiClient.defaults.baseURL);
+  entities.forEach((entity) => url.searchParams.append('entity', entity));
+  const source = new EventSource(url);
+  source.addEventListener('change', (event) => onChange(JSON.parse(event.data)));
+  // 서버가 느린 연결을 끊은 경우로, EventSource가 자동으로 다시 연결합니다.
+  source.addEventListener('resync', () => onChange({ op: 'resync' }));
+  return () => source.close();
+};
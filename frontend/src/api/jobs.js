@@ -0,0 +1,15 @@
+import apiClient from './axios';
+
+// 백엔드 작업 큐에 등록된 작업이 끝날 때까지 롱 폴링으로 기다린 뒤 결과를 돌려줍니다.
+export const waitForJob = async (jobId) => {
+  while (true) {
+    const response = await apiClient.get(`/jobs/${jobId}`, { params: { wait: 25 } });
+    const job = response.data;
+    if (job.status === 'done') {
+      return job.result;
+    }
+    if (job.status === 'failed') {
+      throw new Error(job.error || '작업이 실패했습니다.');
+    }
+  }
+};
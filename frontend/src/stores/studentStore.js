@@ -5,10 +5,11 @@ import apiClient from '../api/axios';
 export const useStudentStore = defineStore('student', () => {
   const students = ref([]);
 
-  // API로부터 모든 학생 목록을 가져오는 비동기 함수
-  const fetchStudents = async () => {
+  // API로부터 학생 목록을 가져오는 비동기 함수
+  // params: { grade, class_num, name(이름 접두어), limit, cursor } — 생략하면 전체 목록
+  const fetchStudents = async (params = {}) => {
     try {
-      const response = await apiClient.get('/students/');
+      const response = await apiClient.get('/students/', { params });
       students.value = response.data;
     } catch (error) {
       console.error('학생 목록을 가져오는 데 실패했습니다:', error);
@@ -16,6 +17,34 @@ export const useStudentStore = defineStore('student', () => {
     }
   };
 
+  // 이름 접두어, 부분 문자열, 초성("ㄱㅁㅅ")으로 학생을 찾는 비동기 함수 (입력할 때마다 호출)
+  const typeaheadStudents = async (query, limit = 50) => {
+    try {
+      const response = await apiClient.get('/students/typeahead', { params: { q: query, limit } });
+      return response.data;
+    } catch (error) {
+      console.error('학생 검색에 실패했습니다:', error);
+      throw error;
+    }
+  };
+
+  // 한 학생의 전체 정보(연락처, 상담 기록 포함)를 가져와 스토어에 반영하는 비동기 함수
+  const fetchStudent = async (studentId) => {
+    try {
+      const response = await apiClient.get(`/students/${studentId}`);
+      const index = students.value.findIndex((s) => s.id === response.data.id);
+      if (index !== -1) {
+        students.value[index] = response.data;
+      } else {
+        students.value.push(response.data);
+      }
+      return response.data;
+    } catch (error) {
+      console.error('학생 정보를 가져오는 데 실패했습니다:', error);
+      throw error;
+    }
+  };
+
   // 새로운 학생을 백엔드에 추가하는 비동기 함수
   const addStudent = async (student) => {
     try {
@@ -28,18 +57,44 @@ export const useStudentStore = defineStore('student', () => {
     }
   };
 
-  // 여러 명의 학생을 한 번에 추가하는 비동기 함수
+  // 여러 명의 학생을 한 번의 요청으로 추가하는 비동기 함수 (검증 실패한 행은 errors로 반환)
   const addStudents = async (newStudents) => {
     try {
-      const promises = newStudents.map((student) => apiClient.post('/students/', student));
-      const responses = await Promise.all(promises);
-      responses.forEach((response) => students.value.push(response.data));
+      const response = await apiClient.post('/students/bulk', newStudents);
+      students.value.push(...response.data.created);
+      return response.data;
     } catch (error) {
       console.error('학생들을 추가하는 데 실패했습니다:', error);
       throw error;
     }
   };
 
+  // 명단 파일을 서버로 업로드해 가져오기 작업을 시작하는 비동기 함수
+  const importStudentsFile = async (file) => {
+    try {
+      const formData = new FormData();
+      formData.append('file', file);
+      const response = await apiClient.post('/students/import', formData, {
+        headers: { 'Content-Type': 'multipart/form-data' },
+      });
+      return response.data;
+    } catch (error) {
+      console.error('명단 파일 업로드에 실패했습니다:', error);
+      throw error;
+    }
+  };
+
+  // 가져오기 작업의 진행 상황을 조회하는 비동기 함수
+  const fetchImportStatus = async (jobId) => {
+    try {
+      const response = await apiClient.get(`/students/import/${jobId}`);
+      return response.data;
+    } catch (error) {
+      console.error('가져오기 진행 상황 조회에 실패했습니다:', error);
+      throw error;
+    }
+  };
+
   // 기존 학생 정보를 업데이트하는 비동기 함수
   const updateStudent = async (updatedStudent) => {
     try {
@@ -101,8 +156,12 @@ export const useStudentStore = defineStore('student', () => {
   return {
     students,
     fetchStudents,
+    fetchStudent,
+    typeaheadStudents,
     addStudent,
     addStudents,
+    importStudentsFile,
+    fetchImportStatus,
     updateStudent,
     deleteStudent,
     deleteAllStudents,
@@ -1,6 +1,7 @@
 import { defineStore } from 'pinia';
 import { ref } from 'vue';
 import apiClient from '../api/axios';
+import { waitForJob } from '../api/jobs';
 
 export const useToDoStore = defineStore('todo', () => {
   const todos = ref([]);
@@ -49,20 +50,58 @@ export const useToDoStore = defineStore('todo', () => {
     }
   };
 
+  // 여러 할 일의 완료 상태를 한 번에 바꾸기
+  // selection: { ids: [...] } 또는 { status: 'all' | 'completed' | 'active' }
+  const setToDosCompleted = async (selection, isCompleted) => {
+    try {
+      const response = await apiClient.post('/todos/bulk/update', { ...selection, is_completed: isCompleted });
+      const changed = new Set(response.data.ids);
+      todos.value.forEach((todo) => {
+        if (changed.has(todo.id)) {
+          todo.is_completed = isCompleted;
+        }
+      });
+    } catch (error) {
+      console.error('할 일 일괄 업데이트에 실패했습니다:', error);
+    }
+  };
+
+  // 여러 할 일을 한 번에 삭제하기 (예: { status: 'completed' } 는 완료된 할 일 모두 삭제)
+  const deleteToDos = async (selection) => {
+    try {
+      const response = await apiClient.post('/todos/bulk/delete', selection);
+      const deleted = new Set(response.data.ids);
+      todos.value = todos.value.filter((todo) => !deleted.has(todo.id));
+    } catch (error) {
+      console.error('할 일 일괄 삭제에 실패했습니다:', error);
+    }
+  };
+
   // 업무일지에서 할 일 추출 (Gemini API 사용)
-  const extractToDosFromLog = async (logContent) => {
+  // 서버는 그 날짜 일지에서 이미 처리한 문단을 기억하므로, 고친 뒤 다시 눌러도 새로 쓴 부분의 할 일만 추가됩니다.
+  // reprocess가 true이면 이미 처리한 문단까지 모두 다시 분석합니다 (이미 있는 할 일은 중복으로 만들지 않음).
+  const extractToDosFromLog = async (logContent, logDate = new Date().toISOString().split('T')[0], reprocess = false) => {
     try {
-      const response = await apiClient.post('/todos/from-log/', { 
-        date: new Date().toISOString().split('T')[0],
+      const response = await apiClient.post('/todos/from-log/jobs', { 
+        date: logDate,
         content: logContent 
-      });
-      todos.value.push(...response.data);
-      alert(`${response.data.length}개의 새로운 할 일이 업무일지에서 추출되었습니다!`);
+      }, { params: { reprocess } });
+      const createdTodos = await waitForJob(response.data.id);
+      todos.value.push(...createdTodos);
+      if (createdTodos.length === 0) {
+        if (!reprocess && confirm('새로 추가할 할 일이 없습니다.\n이미 처리한 문단까지 전체 내용을 다시 분석할까요?')) {
+          await extractToDosFromLog(logContent, logDate, true);
+        } else if (reprocess) {
+          alert('새로 추가할 할 일이 없습니다.');
+        }
+      } else {
+        alert(`${createdTodos.length}개의 새로운 할 일이 업무일지에서 추출되었습니다!`);
+      }
     } catch (error) {
       console.error('업무일지에서 할 일을 추출하는 데 실패했습니다:', error);
       alert('할 일 추출에 실패했습니다. 업무일지 내용이 너무 짧거나 오류가 발생했을 수 있습니다.');
     }
   };
 
-  return { todos, fetchToDos, createToDo, updateToDo, deleteToDo, extractToDosFromLog };
+  return { todos, fetchToDos, createToDo, updateToDo, deleteToDo, setToDosCompleted, deleteToDos, extractToDosFromLog };
 });
\ No newline at end of file
@@ -6,14 +6,38 @@ import apiClient from '../api/axios';
 export const useWorkLogStore = defineStore('workLog', () => {
   const workLogs = ref([]);
   const currentLog = ref(null);
+  const calendarDays = ref([]); // 선택한 달에 일지가 있는 날짜와 미리보기
+  const calendarMonth = ref(null); // { year, month }
 
-  // 모든 업무일지를 가져오는 API
-  const fetchWorkLogs = async () => {
+  // 업무일지 목록을 가져오는 API
+  // params: { from, to, limit, cursor, order: 'asc' | 'desc' } — 생략하면 전체 목록
+  // 다음 페이지가 있으면 그 커서를, 없으면 null을 돌려줍니다.
+  const fetchWorkLogs = async (params = {}) => {
     try {
-      const response = await apiClient.get('/work-logs/');
+      const response = await apiClient.get('/work-logs/', { params });
       workLogs.value = response.data;
+      return response.headers['x-next-cursor'] || null;
     } catch (error) {
       console.error('업무일지를 가져오는 데 실패했습니다:', error);
+      return null;
+    }
+  };
+
+  // 한 달 동안 일지가 있는 날짜와 본문 앞부분만 가져오는 API (달력 표시용)
+  const fetchMonthCalendar = async (year, month) => {
+    try {
+      const response = await apiClient.get(`/work-logs/calendar/${year}/${month}`);
+      calendarMonth.value = { year, month };
+      calendarDays.value = response.data;
+    } catch (error) {
+      console.error('업무일지 달력을 가져오는 데 실패했습니다:', error);
+    }
+  };
+
+  // 저장/삭제 후에는 전체 목록 대신 보고 있는 달의 달력만 새로고침합니다.
+  const refreshCalendar = async () => {
+    if (calendarMonth.value) {
+      await fetchMonthCalendar(calendarMonth.value.year, calendarMonth.value.month);
     }
   };
 
@@ -36,18 +60,31 @@ export const useWorkLogStore = defineStore('workLog', () => {
     try {
       const response = await apiClient.post('/work-logs/', logData);
       currentLog.value = response.data;
-      await fetchWorkLogs(); // 목록 새로고침
+      await refreshCalendar();
     } catch (error) {
       console.error('업무일지 저장에 실패했습니다:', error);
       throw error;
     }
   };
 
+  // 여러 날짜의 업무일지를 한 번에 저장하는 API (같은 날짜가 있으면 덮어씀)
+  // logs: [{ date, content }] — 결과: { created, updated, errors }
+  const importWorkLogs = async (logs) => {
+    try {
+      const response = await apiClient.post('/work-logs/batch', logs);
+      await refreshCalendar();
+      return response.data;
+    } catch (error) {
+      console.error('업무일지 일괄 저장에 실패했습니다:', error);
+      throw error;
+    }
+  };
+
   // 업무일지를 삭제하는 API
   const deleteWorkLog = async (logDate) => {
     try {
       await apiClient.delete(`/work-logs/${logDate}`);
-      await fetchWorkLogs(); // 목록 새로고침
+      await refreshCalendar();
     } catch (error) {
       console.error('업무일지 삭제에 실패했습니다:', error);
       throw error;
@@ -57,9 +94,12 @@ export const useWorkLogStore = defineStore('workLog', () => {
   return {
     workLogs,
     currentLog,
+    calendarDays,
     fetchWorkLogs,
+    fetchMonthCalendar,
     fetchWorkLogByDate,
     saveWorkLog,
+    importWorkLogs,
     deleteWorkLog,
   };
 });
\ No newline at end of file